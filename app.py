@@ -1,15 +1,44 @@
+import startup  # ต้องอยู่บรรทัดแรก: จับเวลา import ที่เหลือ
 import os
+import hmac
+import time
+import asyncio
+import logging
+from datetime import date, timedelta
+from contextlib import asynccontextmanager
+from urllib.parse import quote
 from fastapi import FastAPI, Request, Header, HTTPException
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
-from linebot import LineBotApi, WebhookParser
+from linebot import LineBotApi
 from linebot.models import (
+    DatetimePickerAction,
+    PostbackAction,
+    QuickReply,
+    QuickReplyButton,
     TextSendMessage,
-    ImageSendMessage,
-    FlexSendMessage,
-    TextMessage
 )
-from linebot.models import QuickReply, QuickReplyButton, MessageAction
+startup.mark("import:framework")
+from assets import Assets, build_if_available
+from booking import BookingEngine
+from catalog import CatalogError, CatalogStore, Intent, compile_catalog
+from dedupe import Deduplicator
+from events import EventParser, WebhookError
+from followers import Followers
+from housekeeping import HousekeepingQueue
+import metrics
+from planner import SendPlan, totals as send_totals
+from profiles import ProfileCache
+from ratelimit import DEFAULT_LIMITS, RateLimiter, parse_limits
+from replies import serialize
+from sessions import SessionStore
+from shared_state import open_state
+from static_files import StaticAssets
+from transport import make_line_bot_api, push_raw
+from worker import EventQueue, QueueFull
+startup.mark("import:modules")
+
+logger = logging.getLogger(__name__)
 
 # =====================
 # LOAD ENV
@@ -22,14 +51,13 @@ ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
 if not CHANNEL_SECRET or not ACCESS_TOKEN:
     raise RuntimeError("Missing LINE env vars")
 
-# =====================
-# APP INIT
-# =====================
-app = FastAPI()
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-line_bot_api = LineBotApi(ACCESS_TOKEN)
-parser = WebhookParser(CHANNEL_SECRET)
+# inline = ส่งข้อความให้เสร็จก่อนตอบ 200, queue = ตอบ 200 ทันทีแล้วให้ worker ส่ง
+WEBHOOK_MODE = os.getenv("WEBHOOK_MODE", "inline")
+LINE_API_ENDPOINT = os.getenv("LINE_API_ENDPOINT", LineBotApi.DEFAULT_API_ENDPOINT)
+# fast = โหลด catalog จาก snapshot แล้วย่อรูปหลังเปิดรับ request, full = ทำทุกอย่างให้เสร็จก่อน
+STARTUP_MODE = os.getenv("STARTUP_MODE", "fast")
+# webhook ของ LINE มีไม่กี่ KB ใหญ่เกินนี้ตอบ 413 โดยไม่อ่าน body ต่อ
+WEBHOOK_MAX_BODY = int(os.getenv("WEBHOOK_MAX_BODY", "1048576"))
 
 # =====================
 # BASE URL (Render)
@@ -37,6 +65,116 @@ parser = WebhookParser(CHANNEL_SECRET)
 def BASE_URL():
     return "https://ulandresortline.onrender.com"
 
+# =====================
+# APP INIT
+# =====================
+event_queue = EventQueue(
+    workers=int(os.getenv("WEBHOOK_WORKERS", "8")),
+    maxsize=int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000")),
+    put_timeout=float(os.getenv("WEBHOOK_QUEUE_TIMEOUT", "1.0")),
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    startup.mark("server")
+    build_assets = os.getenv("ASSET_BUILD_ON_STARTUP", "1") == "1"
+    if build_assets and STARTUP_MODE == "full":
+        build_if_available()
+        startup.mark("assets")
+    catalog.reload()
+    startup.mark("catalog")
+    if WEBHOOK_MODE == "queue":
+        await event_queue.start(handle_events)
+    if HOUSEKEEPING_GROUP:
+        housekeeping.start(send_housekeeping)
+    else:
+        logger.warning("HOUSEKEEPING_ADMIN_GROUP not set: cleaning requests are recorded but not pushed")
+    startup.ready()
+    if build_assets and STARTUP_MODE != "full":
+        # ระหว่างนี้ catalog ใช้ URL รูปต้นฉบับไปก่อน
+        startup.run_in_background("assets", rebuild_assets)
+    yield
+    await event_queue.stop()
+    # ส่งคำขอที่ค้างอยู่รอบสุดท้ายก่อนปิด
+    await asyncio.to_thread(housekeeping.stop)
+
+
+app = FastAPI(lifespan=lifespan)
+
+line_bot_api = make_line_bot_api(ACCESS_TOKEN, endpoint=LINE_API_ENDPOINT)
+parser = EventParser(CHANNEL_SECRET)
+# หลาย worker (python serve.py) -> SHARED_STATE="sqlite:state.sqlite3"
+state = open_state(os.getenv("SHARED_STATE", "memory"))
+# worker เดียว -> cache ในตัว dedupe / rate limit / profile พอแล้ว ไม่ต้องเก็บซ้ำ
+shared = state if state.shared else None
+
+dedupe = Deduplicator(
+    window=float(os.getenv("DEDUPE_WINDOW", "3600")),
+    maxsize=int(os.getenv("DEDUPE_SIZE", "100000")),
+    state=shared,
+)
+
+limiter = RateLimiter(
+    parse_limits(os.getenv("RATE_LIMITS", DEFAULT_LIMITS)),
+    collapse_window=float(os.getenv("RATE_COLLAPSE_WINDOW", "5")),
+    state=shared,
+)
+
+profiles = ProfileCache(
+    fetch=lambda user_id: line_bot_api.get_profile(user_id).display_name,
+    ttl=float(os.getenv("PROFILE_CACHE_TTL", "86400")),
+    maxsize=int(os.getenv("PROFILE_CACHE_SIZE", "10000")),
+    state=shared,
+)
+bookings = BookingEngine(
+    os.getenv("BOOKING_DB", "bookings.sqlite3"),
+    horizon=int(os.getenv("BOOKING_HORIZON", "365")),
+    max_nights=int(os.getenv("BOOKING_MAX_NIGHTS", "30")),
+    hold_ttl=float(os.getenv("BOOKING_HOLD_TTL", "600")),
+)
+# คนที่ follow OA (ผู้รับ python broadcast.py)
+followers = Followers(os.getenv("FOLLOWERS_DB", "followers.sqlite3"))
+# session ต่อ user: หลาย worker ใช้ SHARED_STATE, worker เดียวตั้ง SESSION_SPILL เพื่อเก็บตัวที่หลุด LRU
+SESSION_SPILL = os.getenv("SESSION_SPILL")
+sessions = SessionStore(
+    maxsize=int(os.getenv("SESSION_CACHE_SIZE", "50000")),
+    idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "1800")),
+    state=shared,
+    spill=open_state(SESSION_SPILL) if SESSION_SPILL and not shared else None,
+)
+# คำขอทำความสะอาด -> push รวมเป็นรอบไปที่กลุ่มแอดมิน (groupId ของกลุ่ม LINE ที่ bot อยู่)
+HOUSEKEEPING_GROUP = os.getenv("HOUSEKEEPING_ADMIN_GROUP")
+housekeeping = HousekeepingQueue(
+    os.getenv("HOUSEKEEPING_DB", "housekeeping.sqlite3"),
+    os.getenv("HOUSEKEEPING_LOG", "housekeeping.log"),
+    interval=float(os.getenv("HOUSEKEEPING_BATCH_INTERVAL", "300")),
+    threshold=int(os.getenv("HOUSEKEEPING_BATCH_THRESHOLD", "10")),
+)
+assets = Assets()
+static_assets = StaticAssets(
+    assets,
+    stale_max_age=int(os.getenv("STATIC_STALE_MAX_AGE", "300")),
+    legacy_window=float(os.getenv("STATIC_LEGACY_WINDOW", "0")),
+)
+catalog = CatalogStore(
+    os.getenv("CATALOG_PATH", "catalog.json"),
+    compile=lambda data, version, replies: compile_catalog(data, handlers, media, version, replies),
+    check_interval=float(os.getenv("CATALOG_CHECK_INTERVAL", "5")),
+    snapshot=os.getenv("CATALOG_SNAPSHOT", "catalog.compiled") or None,
+    salt=f"{BASE_URL()}|{os.stat(__file__).st_mtime_ns}",
+)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+startup.mark("init")
+
+
+def rebuild_assets():
+    build_if_available()
+    try:
+        catalog.reload()
+    except CatalogError as e:
+        logger.error("catalog reload after asset build failed:\n%s", e)
+
 # =====================
 # HEALTH CHECK
 # =====================
@@ -44,478 +182,583 @@ def BASE_URL():
 def root():
     return {"status": "ok"}
 
+
+# =====================
+# STATIC (fingerprinted URL + ETag + immutable cache)
+# =====================
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"])
+def static(path: str, request: Request):
+    return static_assets.respond(path, request)
+
+
+@app.get("/stats")
+def stats():
+    return {
+        "profiles": profiles.stats(),
+        "sends": send_totals,
+        "dedupe": dedupe.stats(),
+        "rate_limit": limiter.stats(),
+        "catalog": catalog.stats(),
+        "bookings": bookings.stats(),
+        "housekeeping": housekeeping.stats(),
+        "sessions": sessions.stats(),
+    }
+
+
+def check_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404)
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403)
+
+
+# =====================
+# ADMIN: โหลด catalog.json ใหม่ทันที (ปกติจะโหลดเองเมื่อไฟล์เปลี่ยน)
+# =====================
+@app.post("/admin/reload")
+async def admin_reload(x_admin_token: str = Header(None)):
+    check_admin(x_admin_token)
+    try:
+        content = await asyncio.to_thread(catalog.reload)
+    except CatalogError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    return {"version": content.version}
+
+
+# =====================
+# ADMIN: แม่บ้านทำความสะอาดเสร็จ (id = เลขในข้อความที่ส่งเข้ากลุ่ม)
+# =====================
+@app.post("/admin/housekeeping/{request_id}/done")
+async def admin_housekeeping_done(request_id: int, x_admin_token: str = Header(None)):
+    check_admin(x_admin_token)
+    request = await asyncio.to_thread(housekeeping.mark_done, request_id)
+    if request is None:
+        raise HTTPException(status_code=404)
+    return {"id": request.id, "status": request.status}
+
+# =====================
+# METRICS (Prometheus)
+# =====================
+INTENT_TOTAL = metrics.Counter("line_intent_total", "Matched intents", ("intent", "outcome"))
+WEBHOOK_SECONDS = metrics.Histogram("webhook_request_seconds", "Webhook request handling time")
+WEBHOOK_STAGE_SECONDS = metrics.Histogram(
+    "webhook_stage_seconds", "Time spent per webhook stage", ("stage",)
+)
+WEBHOOK_REQUESTS = metrics.Counter("webhook_requests_total", "Webhook responses", ("status",))
+metrics.Callback("webhook_queue_depth", "Deliveries waiting for a worker", event_queue.depth)
+metrics.Callback("dedupe_dropped_total", "Redelivered events dropped", lambda: dedupe.dropped, "counter")
+metrics.Callback("rate_limited_total", "Intents shed by rate limit", lambda: limiter.limited, "counter")
+metrics.Callback("rate_collapsed_total", "Repeated intents collapsed", lambda: limiter.collapsed, "counter")
+metrics.Callback("profile_cache_hits_total", "Profile cache hits", lambda: profiles.hits, "counter")
+metrics.Callback("profile_cache_misses_total", "Profile cache misses", lambda: profiles.misses, "counter")
+metrics.Callback("send_calls_total", "LINE send calls made", lambda: send_totals["calls"], "counter")
+metrics.Callback("send_calls_saved_total", "LINE send calls saved by batching", lambda: send_totals["saved"], "counter")
+metrics.Callback("send_calls_failed_total", "LINE send calls that failed", lambda: send_totals["failed"], "counter")
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# PROFILER_ENABLED=1 แล้วเรียก /debug/profile?seconds=10 ระหว่างมี traffic
+@app.get("/debug/profile")
+async def debug_profile(seconds: float = 10.0):
+    if os.getenv("PROFILER_ENABLED") != "1":
+        raise HTTPException(status_code=404)
+    import profiler
+
+    stacks = await asyncio.to_thread(profiler.sample, min(seconds, 60.0))
+    return PlainTextResponse(stacks)
+
+
+# เวลาที่ใช้ตอน cold start แยกตามขั้น (import, init, catalog, webhook แรก)
+@app.get("/debug/startup")
+def debug_startup():
+    return {"mode": STARTUP_MODE, **startup.report(), "catalog": catalog.stats()}
+
 # =====================
 # WEBHOOK
 # =====================
 @app.post("/webhook")
 async def webhook(request: Request, x_line_signature: str = Header(None)):
-    body = (await request.body()).decode("utf-8")
+    started = time.perf_counter()
+    status = 200
+    try:
+        return await process_webhook(request, x_line_signature)
+    except HTTPException as e:
+        status = e.status_code
+        raise
+    finally:
+        WEBHOOK_REQUESTS.inc(str(status))
+        WEBHOOK_SECONDS.observe(time.perf_counter() - started)
+        startup.webhook_done(time.perf_counter() - started)
+
+
+async def process_webhook(request, x_line_signature):
+    started = time.perf_counter()
+    # ไม่มี signature -> ปฏิเสธก่อนอ่าน body
+    if not x_line_signature:
+        raise HTTPException(status_code=400, detail="Invalid signature")
+    body = await read_body(request, WEBHOOK_MAX_BODY)
 
     try:
         events = parser.parse(body, x_line_signature)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid signature")
+    except WebhookError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    WEBHOOK_STAGE_SECONDS.observe(time.perf_counter() - started, "parse")
+
+    if WEBHOOK_MODE == "queue":
+        try:
+            await event_queue.submit(events)
+        except QueueFull:
+            # คิวเต็ม -> ให้ LINE ส่ง webhook ซ้ำภายหลัง
+            raise HTTPException(status_code=503, detail="Busy")
+    else:
+        try:
+            await asyncio.to_thread(handle_events, events)
+        except DeliveryFailed:
+            # LINE ส่ง webhook ซ้ำ (isRedelivery) -> user ที่ส่งไม่สำเร็จได้ลองใหม่
+            raise HTTPException(status_code=500, detail="Send failed")
 
-    for event in events:
+    return {"ok": True}
 
-        # =====================
-        # POSTBACK (Rich Menu / Card Button)
-        # =====================
-        if event.type == "postback":
-            handle_postback(event)
 
-        # =====================
-        # TEXT MESSAGE (พิมพ์เอง)
-        # =====================
-        elif event.type == "message" and isinstance(event.message, TextMessage):
-            handle_text(event)
+# อ่าน body ทีละ chunk หยุดทันทีที่เกิน limit (Content-Length บอกมาเกินก็ไม่อ่านเลย)
+async def read_body(request, limit):
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > limit:
+        raise HTTPException(status_code=413, detail="Body too large")
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail="Body too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
 
-    return {"ok": True}
+
+class DeliveryFailed(Exception):
+    pass
+
+
+# ทุก event ใน delivery เดียวกันใช้ SendPlan (และ catalog เวอร์ชันเดียวกัน) ร่วมกัน แล้วส่งทีเดียวตอนจบ
+def handle_events(events):
+    started = time.perf_counter()
+    plan = SendPlan(catalog.get())
+    # LINE ส่ง webhook ซ้ำ (redelivery) -> ข้าม event ที่เคยทำไปแล้ว
+    accepted = [event for event in events if dedupe.first_seen(event)]
+    try:
+        for event in accepted:
+            try:
+                handle_event(event, plan)
+            except Exception:
+                logger.exception("event handler failed")
+        sending = time.perf_counter()
+        WEBHOOK_STAGE_SECONDS.observe(sending - started, "dispatch")
+        result = plan.flush(line_bot_api)
+        WEBHOOK_STAGE_SECONDS.observe(time.perf_counter() - sending, "send")
+    except BaseException:
+        # ตอบ 500 แล้ว LINE จะส่งซ้ำ -> redelivery ต้องไม่ถูกทิ้งว่าเคยเห็นแล้ว
+        dedupe.forget(accepted)
+        raise
+    failed = result["failed_users"]
+    if failed:
+        # ลืมเฉพาะ event ของ user ที่ส่งไม่สำเร็จ redelivery ของ user อื่นยังถูกทิ้งเป็น duplicate ตามเดิม
+        dedupe.forget([event for event in accepted if event.source.user_id in failed])
+        raise DeliveryFailed(f"send failed for {len(failed)} user(s)")
+
+
+def handle_event(event, plan):
+    # =====================
+    # POSTBACK (Rich Menu / Card Button)
+    # =====================
+    if event.type == "postback":
+        session = sessions.get(event.source.user_id)
+        handle_postback(event, plan, session)
+        sessions.save(session)
+
+    # =====================
+    # TEXT MESSAGE (พิมพ์เอง)
+    # =====================
+    elif event.type == "message" and event.message.type == "text":
+        session = sessions.get(event.source.user_id)
+        handle_text(event, plan, session)
+        sessions.save(session)
+
+    # =====================
+    # FOLLOW / UNFOLLOW (ชื่อโปรไฟล์อาจเปลี่ยน -> ล้าง cache)
+    # =====================
+    elif event.type in ("follow", "unfollow"):
+        profiles.invalidate(event.source.user_id)
+        followers.follow(event.source.user_id, following=event.type == "follow")
 
 # =====================
-# POSTBACK HANDLER
+# REPLY HELPERS
 # =====================
-def handle_postback(event):
-    action = event.postback.data
-
-    if action == "coffee":
-        line_bot_api.reply_message(
-            event.reply_token,
-            [
-                TextSendMessage(
-                    text="☕ ULand Coffee\nพร้อมเสิร์ฟความอร่อยทุกวัน 💛\nเปิดให้บริการเวลา 07.00 - 17.00 น.\nโทร 📞 094-7802363"
-                ),
-                ImageSendMessage(
-                    original_content_url=f"{BASE_URL()}/static/images/menu.JPG",
-                    preview_image_url=f"{BASE_URL()}/static/images/menu.JPG",
-                ),
-                ImageSendMessage(
-                    original_content_url=f"{BASE_URL()}/static/images/special1.png",
-                    preview_image_url=f"{BASE_URL()}/static/images/special1.png",
-                ),
-                ImageSendMessage(
-                    original_content_url=f"{BASE_URL()}/static/images/special2.png",
-                    preview_image_url=f"{BASE_URL()}/static/images/special2.png",
-                ),
-                ImageSendMessage(
-                    original_content_url=f"{BASE_URL()}/static/images/special.JPG",
-                    preview_image_url=f"{BASE_URL()}/static/images/special.JPG",
-                ),
-            ]
-        )
+# ชื่อไฟล์ต้นฉบับอาจมีช่องว่าง ("TS_1 .jpg") -> quote ให้เป็น URL ที่ใช้ได้
+def static_url(path):
+    return f"{BASE_URL()}/static/{quote(static_assets.url_path(path))}"
 
-    elif action in ["room_price", "rooms"]:
-        send_room_card(event)
 
-    elif action == "location":
-        line_bot_api.reply_message(
-            event.reply_token,
-            TextSendMessage(
-                text="📍 แผนที่ Uland Resort\nhttps://maps.app.goo.gl/UQ4tG2kCCdW2E9em8"
-            )
-        )
+# URL (original, preview) ของภาพใน static/images หรือ None ถ้าไม่มีไฟล์
+def media(name):
+    if not assets.exists(name):
+        return None
+    original, preview = assets.paths(name)
+    return static_url(original), static_url(preview)
 
-    # elif action == "contact":
-    #     profile = line_bot_api.get_profile(event.source.user_id)
-    #     nickname = profile.display_name
-
-    #     line_bot_api.reply_message(
-    #         event.reply_token,
-    #         TextSendMessage(
-    #            f"คุณ {nickname} ต้องการสอบถามเรื่องอะไรดีคะ 😊\n"
-    #             "สามารถพิมพ์ 👉🏻หมายเลข👈🏻 เรื่องที่ต้องการสอบถามได้เลยค่ะ\n\n"
-    #             "1. ประเภทและราคาห้องพัก\n"
-    #             "2. รูปภาพรีสอร์ทและห้องพัก\n"
-    #             "3. แผนที่รีสอร์ท\n"
-    #             "4. รหัส Wi-Fi\n"
-    #             "5. เมนูร้าน ULand Coffee"
-    #         )
-    #     )
-
-    # ===== ROOM DETAIL =====
-    #สุขใจ 550
-    elif action == "room_detail_sj":
-        line_bot_api.reply_message(
-            event.reply_token,
-            [
-                TextSendMessage(
-                    text=(
-                        "💖💖 ห้องพักโซนสุขใจ 550 บาท/คืน 💖💖\n"
-                        "สิ่งอำนวยความสะดวกภายในห้องพัก\n"
-                        "- ผ้าม่านโปร่งแสง\n"
-                        "- เครื่องทำน้ำอุ่น\n"
-                        "- ผ้าเช็ดตัว\n"
-                        "- แอร์\n"
-                        "- โต๊ะทำงาน\n"
-                        "- ตู้เย็น\n"
-                        "- ตู้เสื้อผ้า\n"
-                        "- บริการลานจอดรถ\n"
-                        "\n"
-                        "สิ่งอำนวยความสะดวกภายในรีสอร์ท\n"
-                        "- ร้านอาหาร\n"
-                        "- ร้านคาเฟ่\n"
-                        "- ร้านซักอบรีด\n"
-                        "- ร้านยา\n"
-                    )
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/SJ_1.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/SJ_1.jpg",
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/SJ_2.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/SJ_2.jpg",
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/SJ_3.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/SJ_3.jpg",
-                ),
-            ]
-        )
-    
-    #เติทสุข 590
-    elif action == "room_detail_ts":
-        line_bot_api.reply_message(
-            event.reply_token,
-            [
-                TextSendMessage(
-                    text=(
-                        "💖💖 ห้องพักโซนเติมสุข 590 บาท/คืน 💖💖\n"
-                        "สิ่งอำนวยความสะดวกภายในห้องพัก\n"
-                        "- ผ้าม่านโปร่งแสง\n"
-                        "- เครื่องทำน้ำอุ่น\n"
-                        "- ผ้าเช็ดตัว\n"
-                        "- แอร์\n"
-                        "- โต๊ะทำงาน\n"
-                        "- ตู้เย็น\n"
-                        "- ตู้เสื้อผ้า\n"
-                        "- ที่จอดรถหน้าบ้าน\n"
-                        "\n"
-                        "สิ่งอำนวยความสะดวกภายในรีสอร์ท\n"
-                        "- ร้านอาหาร\n"
-                        "- ร้านคาเฟ่\n"
-                        "- ร้านซักอบรีด\n"
-                        "- ร้านยา\n"
-                    )
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/TS_1.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/TS_1.jpg",
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/TS_2.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/TS_2.jpg",
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/TS_3.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/TS_3.jpg",
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/TS_4.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/TS_4.jpg",
-                ),
-            ]
-        )
-        user_id = event.source.user_id
-
-        line_bot_api.push_message(
-            user_id,
-            ImageSendMessage(
-                original_content_url=f"{BASE_URL()}/static/images/TS_5.jpg",
-                preview_image_url=f"{BASE_URL()}/static/images/TS_5.jpg",
-            )
-        )
-    #ก่อสุข 690
-    elif action == "room_detail_ks":
-        line_bot_api.reply_message(
-            event.reply_token,
-            [
-                TextSendMessage(
-                    text=(
-                        "💖💖 ห้องพักโซนก่อสุข 690 บาท/คืน 💖💖\n"
-                        "สิ่งอำนวยความสะดวกภายในห้องพัก\n"
-                        "- ระเบียงหลังบ้าน\n"
-                        "- ผ้าม่านโปร่งแสง\n"
-                        "- เครื่องทำน้ำอุ่น\n"
-                        "- ผ้าเช็ดตัว\n"
-                        "- แอร์\n"
-                        "- โต๊ะทำงาน\n"
-                        "- ตู้เย็น\n"
-                        "- ตู้เสื้อผ้า\n"
-                        "- ที่จอดรถหน้าบ้าน\n"
-                        "\n"
-                        "สิ่งอำนวยความสะดวกภายในรีสอร์ท\n"
-                        "- ร้านอาหาร\n"
-                        "- ร้านคาเฟ่\n"
-                        "- ร้านซักอบรีด\n"
-                        "- ร้านยา\n"
-                    )
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/KS_1.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/KS_1.jpg",
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/KS_2.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/KS_2.jpg",
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/KS_3.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/KS_3.jpg",
-                ),
-                ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/KS_4.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/KS_4.jpg",
-                ),
-            ]
-        )
-        user_id = event.source.user_id
-
-        line_bot_api.push_message(
-            user_id,
-            ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/KS_5.jpg",
-                        preview_image_url=f"{BASE_URL()}/static/images/KS_5.jpg",
-            ),
-        )
 
+def reply(event, plan, name):
+    plan.reply(event, plan.content.replies[name])
 
-    # elif action == "room_detail":
-    #     line_bot_api.reply_message(
-    #         event.reply_token,
-    #         TextSendMessage(
-    #             text="🛎 ห้องพักมี แอร์ / น้ำอุ่น / Wi-Fi / ทีวี / ตู้เย็น"
-    #         )
-    #     )
-
-    elif action == "book_room":
-        line_bot_api.reply_message(
-            event.reply_token,
-            TextSendMessage(
-                text="กรุุณารอสักครู่ระบบกำลังติดต่อแอดมิน"
-            )
-        )
+# =====================
+# POSTBACK HANDLER
+# =====================
+# data แบบ "<intent>:<ค่า>" (เช่น book_room:sj) match ด้วยส่วนหน้า ":" ค่าที่เหลือให้ handler อ่านเอง
+def handle_postback(event, plan, session):
+    name = event.postback.data.partition(":")[0]
+    dispatch(plan.content.postback_intents.match(name), event, plan, session)
 
 # =====================
 # TEXT HANDLER (พิมพ์เลข)
 # =====================
-def handle_text(event):
-    text = event.message.text.strip().lower()
-
-    # 1 = ห้องพัก
-    if text in ["1", "1.", "ราคา", "ประเภทและราคาห้องพัก"]:
-        send_room_card(event)
-
-    # 2 = รูปที่พัก
-    elif text in ["2", "2.", "รูปภาพที่พัก"]:
-        line_bot_api.reply_message(
-            event.reply_token,
-            [
-                ImageSendMessage(
-                    original_content_url=f"{BASE_URL()}/static/images/V1.jpg",
-                    preview_image_url=f"{BASE_URL()}/static/images/V1.jpg",
-                ),
-                ImageSendMessage(
-                    original_content_url=f"{BASE_URL()}/static/images/V2.jpg",
-                    preview_image_url=f"{BASE_URL()}/static/images/V2.jpg",
-                ),
-                ImageSendMessage(
-                    original_content_url=f"{BASE_URL()}/static/images/V3.jpg",
-                    preview_image_url=f"{BASE_URL()}/static/images/V3.jpg",
-                ),
-            ]
-        )
+def handle_text(event, plan, session):
+    intent = plan.content.text_intents.match(event.message.text)
+    if intent is None:
+        intent = follow_up(session)
+    dispatch(intent, event, plan, session)
+
+
+# ข้อความที่ไม่ตรง intent ไหน -> ต่อจากขั้นตอน / เมนูที่ค้างอยู่ใน session
+def follow_up(session):
+    if session.step is not None:
+        return RESUME_BOOKING
+    if session.menu == "contact":
+        return CONTACT_MESSAGE
+    return None
+
+
+# input ที่ผู้ใช้ส่งมาจริง (postback data + วันที่ที่เลือก / ข้อความ) ใช้ตัดสิน collapse
+# ปุ่มเดิมกดซ้ำ = ค่าเดิม, เลือกโซน / วันใหม่ใน flow จอง = ค่าใหม่ ไม่ถูก collapse
+def event_input(event):
+    if event.type == "postback":
+        params = event.postback.params
+        if not params:
+            return event.postback.data
+        return event.postback.data + "|" + "|".join(f"{k}={v}" for k, v in sorted(params.items()))
+    return event.message.text
+
+
+# ชื่อ intent สำหรับ RATE_LIMITS คือ key ใน "intents" ของ catalog.json เช่น coffee
+def dispatch(intent, event, plan, session):
+    if intent is None:
+        INTENT_TOTAL.inc("unmatched", "ignored")
+        return
+    if not limiter.allow(event.source.user_id, intent.name, event_input(event)):
+        INTENT_TOTAL.inc(intent.name, "limited")
+        return
+    INTENT_TOTAL.inc(intent.name, "handled")
+    if intent.handler is not None:
+        intent.handler(event, plan, session)
+    else:
+        reply(event, plan, intent.reply)
 
-    # 3 = แผนที่
-    elif text in ["3", "3.", "แผนที่รีสอร์ท"]:
-        line_bot_api.reply_message(
-            event.reply_token,
-            TextSendMessage(
-                text="📍ยูแลนด์รีสอร์ท ULand Resort \n https://maps.app.goo.gl/UQ4tG2kCCdW2E9em8"
-            )
-        )
+# =====================
+# INTENTS
+# alias / ข้อความตอบกลับอยู่ใน catalog.json
+# intent ที่ต้องใช้โค้ด อ้างด้วย "handler": "<ชื่อ>" แล้วลงทะเบียนที่นี่
+# =====================
+handlers = {}
 
-    # 4 = wifi
-    elif text in ["4", "4.", "wifi", "รหัส wifi"]:
-        line_bot_api.reply_message(
-            event.reply_token,
-            TextSendMessage(
-                text="Wi-Fi: U Land Resort\nPassword: 92330000"
-            )
-        )
 
-    # 5 = coffee
-    elif text in ["5", "5.", "coffee", "uland coffee"]:
-        line_bot_api.reply_message(
-            event.reply_token,
-            [
-                TextSendMessage(
-                    text="☕ ULand Coffee\nพร้อมเสิร์ฟความอร่อยทุกวัน 💛\nเปิดให้บริการเวลา 07.00 - 17.00 น.\nโทร 📞 094-7802363"
-                    ),
-                    ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/menu.JPG",
-                        preview_image_url=f"{BASE_URL()}/static/images/menu.JPG",
-                    ),
-                    ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/special1.png",
-                        preview_image_url=f"{BASE_URL()}/static/images/special1.png",
-                    ),
-                    ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/special2.png",
-                        preview_image_url=f"{BASE_URL()}/static/images/special2.png",
-                    ),
-            ]
-        )
-        user_id = event.source.user_id
-
-        line_bot_api.push_message(
-            user_id,
-            ImageSendMessage(
-                        original_content_url=f"{BASE_URL()}/static/images/special.JPG",
-                        preview_image_url=f"{BASE_URL()}/static/images/special.JPG",
-            ),
-        )
+def handler(name):
+    def register(fn):
+        handlers[name] = fn
+        return fn
+    return register
 
-     # 6 = cleaning
-    elif text in ["6", "6.", "cleaning", "ทำความสะอาดห้องพัก", "6 ทำความสะอาดห้องพัก"]:
-        line_bot_api.reply_message(
-            event.reply_token,
-            [
-                TextSendMessage(
-                    text="ระบบได้แจ้งแอดมินให้ทำความสะอาดห้องพักของคุณเรียบร้อยแล้วค่ะ 😊"
-                    ),
-            ]
-        )
-    #ติดต่อสอบถาม
-    elif text in ["contact", "ติดต่อสอบถาม", "contact/faq"]:
-        profile = line_bot_api.get_profile(event.source.user_id)
-        nickname = profile.display_name
-
-        line_bot_api.reply_message(
-            event.reply_token,
-            TextSendMessage(
-                f"คุณ {nickname} ต้องการสอบถามเรื่องอะไรดีคะ สามารถพิมพ์หมายเลขหรือกดที่เมนูด้านล่างได้เลยค่ะ 😊\n"
-                "1. ประเภทและราคาห้องพัก\n"
-                "2. รูปภาพรีสอร์ทและห้องพัก\n"
-                "3. แผนที่รีสอร์ท\n"
-                "4. รหัส Wi-Fi\n"
-                "5. เมนูร้าน ULand Coffee\n"
-                "6. ทำความสะอาดห้องพัก",
-
-            )
-        )
-        user_id = event.source.user_id
-
-        line_bot_api.push_message(
-            user_id,
-            TextSendMessage(
-                "หากต้องการติดต่อสอบถามเรื่องอื่นๆ สามารถทิ้งข้อความไว้ได้เลยค่ะแอดมินจะติดต่อกลับโดยเร็วที่สุด\n\nติดต่อด่วน โทร 062-8899824 , 065-7546414 , (หลัง 22.00 น. 094-7802363)",
-                quick_reply=QuickReply(
-                    items=[
-                        QuickReplyButton(
-                            action=MessageAction(label="💰 ประเภทและราคาห้องพัก", text="1")
-                        ),
-                        QuickReplyButton(
-                            action=MessageAction(label="🖼 รูปภาพที่พัก", text="2")
-                        ),
-                        QuickReplyButton(
-                            action=MessageAction(label="📍 แผนที่รีสอร์ท", text="3")
-                        ),
-                        QuickReplyButton(
-                            action=MessageAction(label="📶 รหัส Wi-Fi", text="4")
-                        ),
-                        QuickReplyButton(
-                            action=MessageAction(label="☕ ULand Coffee", text="5")
-                        ),
-                        QuickReplyButton(
-                            action=MessageAction(label="🧹 ทำความสะอาดห้องพัก", text="6 ทำความสะอาดห้องพัก")
-                        ),
-                    ]
-                )
-            ),
-        )
+
+#ติดต่อสอบถาม
+@handler("contact")
+def contact_intent(event, plan, session):
+    nickname = profiles.display_name(event.source.user_id)
+    greeting = plan.content.texts["contact_greeting"].format(nickname=nickname)
+    plan.reply(event, [serialize(TextSendMessage(greeting))])
+    reply(event, plan, "contact_menu")
+    session.menu = "contact"
+
+
+# เปิดเมนูติดต่อแล้วพิมพ์คำถามเอง (ไม่ตรงเมนู) -> รับเรื่องให้แอดมินครั้งเดียว
+def contact_message_intent(event, plan, session):
+    _text(event, plan, plan.content.texts["contact_received"])
+    session.menu = None
+
+
+# =====================
+# BOOKING
+# book_room:<zone> -> เลือกวันเช็คอิน -> book_check_in:<zone> -> เลือกวันเช็คเอาท์
+# -> book_check_out:<zone>:<check_in> -> hold ห้องไว้ BOOKING_HOLD_TTL วินาที
+# -> book_confirm:<id> / book_cancel:<id>
+# ค่าที่ใช้ต่ออยู่ใน postback data, session.step จำว่าค้างขั้นไหน
+# (พิมพ์อย่างอื่นระหว่างจอง -> ถามขั้นเดิมซ้ำ)
+# =====================
+def _args(event):
+    return event.postback.data.split(":")[1:]
+
+
+def _picked_date(event):
+    try:
+        return date.fromisoformat((event.postback.params or {}).get("date", ""))
+    except ValueError:
+        return None
+
+
+def _booking_zone(plan, zone_id):
+    # rooms เปลี่ยนได้เมื่อ reload catalog
+    bookings.use_rooms(plan.content.rooms)
+    if zone_id not in plan.content.rooms:
+        return None
+    return plan.content.zones[zone_id]
+
+
+def _quick(*actions):
+    return QuickReply(items=[QuickReplyButton(action=a) for a in actions])
+
+
+def _date_picker(label, data, first, last):
+    return DatetimePickerAction(
+        label=label, data=data, mode="date",
+        initial=first.isoformat(), min=first.isoformat(), max=last.isoformat(),
+    )
+
+
+def _text(event, plan, text, quick_reply=None):
+    plan.reply(event, [serialize(TextSendMessage(text=text, quick_reply=quick_reply))])
+
+
+def _invalid_dates(event, plan):
+    text = plan.content.texts["booking_invalid_dates"]
+    _text(event, plan, text.format(max_nights=bookings.max_nights, horizon=bookings.horizon))
+
+
+def _ask_check_in(event, plan, session, zone):
+    texts = plan.content.texts
+    today = bookings.today()
+    picker = _date_picker(
+        texts["booking_check_in_button"], f"book_check_in:{zone['id']}",
+        today, today + timedelta(days=bookings.horizon - 1),
+    )
+    text = texts["booking_pick_check_in"].format(name=zone["name"], price=zone["price"])
+    _text(event, plan, text, _quick(picker))
+    session.set_step("check_in", zone["id"])
+
+
+def _ask_check_out(event, plan, session, zone, check_in):
+    texts = plan.content.texts
+    last = min(
+        check_in + timedelta(days=bookings.max_nights),
+        bookings.today() + timedelta(days=bookings.horizon),
+    )
+    picker = _date_picker(
+        texts["booking_check_out_button"], f"book_check_out:{zone['id']}:{check_in}",
+        check_in + timedelta(days=1), last,
+    )
+    text = texts["booking_pick_check_out"].format(check_in=check_in, max_nights=bookings.max_nights)
+    _text(event, plan, text, _quick(picker))
+    session.set_step("check_out", f"{zone['id']}:{check_in}")
+
+
+def _ask_confirm(event, plan, session, zone, booking):
+    texts = plan.content.texts
+    text = texts["booking_held"].format(
+        name=zone["name"], room=booking.room, check_in=booking.check_in, check_out=booking.check_out,
+        nights=booking.nights, total=booking.nights * zone["price"],
+        minutes=max(1, -int((time.time() - booking.expires_at) // 60)),
+    )
+    _text(event, plan, text, _quick(
+        PostbackAction(label=texts["booking_confirm_button"], data=f"book_confirm:{booking.id}"),
+        PostbackAction(label=texts["booking_cancel_button"], data=f"book_cancel:{booking.id}"),
+    ))
+    session.set_step("confirm", str(booking.id))
+
+
+@handler("book_room")
+def book_room_intent(event, plan, session):
+    args = _args(event)
+    zone = _booking_zone(plan, args[0]) if args else None
+    if zone is None:
+        # โซนที่ยังไม่ได้ใส่ rooms ใน catalog -> ให้แอดมินจัดการแบบเดิม
+        reply(event, plan, "book_room")
+        return
+    _ask_check_in(event, plan, session, zone)
+
+
+@handler("book_check_in")
+def book_check_in_intent(event, plan, session):
+    args = _args(event)
+    zone = _booking_zone(plan, args[0]) if args else None
+    check_in = _picked_date(event)
+    if zone is None or check_in is None or not bookings.valid_range(check_in, check_in + timedelta(days=1)):
+        _invalid_dates(event, plan)
+        return
+    _ask_check_out(event, plan, session, zone, check_in)
+
+
+@handler("book_check_out")
+def book_check_out_intent(event, plan, session):
+    args = _args(event)
+    zone = _booking_zone(plan, args[0]) if args else None
+    check_out = _picked_date(event)
+    try:
+        check_in = date.fromisoformat(args[1])
+    except (IndexError, ValueError):
+        check_in = None
+    if zone is None or check_in is None or check_out is None or not bookings.valid_range(check_in, check_out):
+        _invalid_dates(event, plan)
+        return
+    booking = bookings.hold(zone["id"], check_in, check_out, event.source.user_id)
+    if booking is not None:
+        _ask_confirm(event, plan, session, zone, booking)
+        return
+    texts = plan.content.texts
+    text = texts["booking_full"].format(name=zone["name"], check_in=check_in, check_out=check_out)
+    others = [
+        plan.content.zones[z]["name"]
+        for z, free in bookings.availability(check_in, check_out).items()
+        if free and z != zone["id"]
+    ]
+    if others:
+        text += "\n" + texts["booking_alternatives"].format(zones=", ".join(others))
+    _text(event, plan, text)
+    session.clear_step()
+
+
+def _booking_id(event):
+    args = _args(event)
+    return int(args[0]) if args and args[0].isdigit() else None
+
+
+@handler("book_confirm")
+def book_confirm_intent(event, plan, session):
+    booking_id = _booking_id(event)
+    booking = bookings.confirm(booking_id, event.source.user_id) if booking_id is not None else None
+    texts = plan.content.texts
+    session.clear_step()
+    if booking is None:
+        _text(event, plan, texts["booking_expired"])
+        return
+    zone = plan.content.zones.get(booking.zone, {"name": booking.zone, "price": 0})
+    _text(event, plan, texts["booking_confirmed"].format(
+        id=booking.id, name=zone["name"], room=booking.room,
+        check_in=booking.check_in, check_out=booking.check_out,
+        nights=booking.nights, total=booking.nights * zone["price"],
+    ))
+
+
+@handler("book_cancel")
+def book_cancel_intent(event, plan, session):
+    booking_id = _booking_id(event)
+    cancelled = booking_id is not None and bookings.cancel(booking_id, event.source.user_id)
+    texts = plan.content.texts
+    session.clear_step()
+    _text(event, plan, texts["booking_cancelled"] if cancelled else texts["booking_expired"])
+
+
+# พิมพ์ข้อความที่ไม่ตรง intent ระหว่างจอง -> ถามขั้นที่ค้างอยู่ซ้ำ
+def resume_booking_intent(event, plan, session):
+    if session.step == "confirm":
+        booking = bookings.get(int(session.data))
+        if booking is not None and booking.user_id == session.user_id and booking.active():
+            zone = plan.content.zones.get(booking.zone)
+            if zone is not None:
+                _ask_confirm(event, plan, session, zone, booking)
+                return
+        session.clear_step()
+        _text(event, plan, plan.content.texts["booking_expired"])
         return
+    zone_id, _, check_in = session.data.partition(":")
+    zone = _booking_zone(plan, zone_id)
+    if zone is None:
+        session.clear_step()
+        return
+    if session.step == "check_out" and date.fromisoformat(check_in) >= bookings.today():
+        _ask_check_out(event, plan, session, zone, date.fromisoformat(check_in))
+    else:
+        _ask_check_in(event, plan, session, zone)
+
 
 # =====================
-# ROOM CARD
+# HOUSEKEEPING
+# บันทึกคำขอแล้วตอบทันที กลุ่มแอดมินได้รับเป็นรอบ (housekeeping.py)
 # =====================
-def send_room_card(event):
-    line_bot_api.reply_message(
-        event.reply_token,
-        FlexSendMessage(
-            alt_text="ประเภทและราคาห้องพัก",
-            contents=hotel_cards()
+def _housekeeping_status(texts, request):
+    return texts[f"housekeeping_{request.status}"]
+
+
+@handler("cleaning")
+def cleaning_intent(event, plan, session):
+    user_id = event.source.user_id
+    texts = plan.content.texts
+    request, created = housekeeping.submit(user_id, room=bookings.current_room(user_id))
+    if created:
+        text = texts["housekeeping_received"].format(
+            id=request.id, minutes=max(1, int(housekeeping.interval // 60))
+        )
+    else:
+        text = texts["housekeeping_duplicate"].format(
+            id=request.id, status=_housekeeping_status(texts, request)
+        )
+    _text(event, plan, text)
+
+
+@handler("housekeeping_status")
+def housekeeping_status_intent(event, plan, session):
+    texts = plan.content.texts
+    request = housekeeping.latest(event.source.user_id)
+    if request is None:
+        _text(event, plan, texts["housekeeping_none"])
+        return
+    _text(event, plan, texts["housekeeping_status"].format(
+        id=request.id, day=request.day, status=_housekeeping_status(texts, request)
+    ))
+
+
+# ชื่อแขกดึงตอนส่งรอบ (ไม่ให้ LINE API ล่มทำให้รับคำขอไม่ได้) ดึงไม่ได้ -> "-"
+def _guest_name(user_id):
+    if not user_id:
+        return "-"
+    try:
+        return profiles.display_name(user_id)
+    except Exception:
+        logger.warning("profile lookup for %s failed", user_id, exc_info=True)
+        return "-"
+
+
+def send_housekeeping(requests):
+    texts = catalog.get().texts
+    items = "\n".join(
+        texts["housekeeping_batch_item"].format(
+            id=r.id, room=r.room or "-", name=_guest_name(r.user_id),
+            time=time.strftime("%H:%M", time.localtime(r.created_at)),
         )
+        for r in requests
     )
+    text = texts["housekeeping_batch"].format(count=len(requests), items=items)
+    push_raw(line_bot_api, HOUSEKEEPING_GROUP, [serialize(TextSendMessage(text=text))])
 
-def hotel_cards():
-    return {
-        "type": "carousel",
-        "contents": [
-            room_card(
-                title='ห้องพักโซน "สุขใจ"',
-                price="550 บาท / คืน",
-                image_url=f"{BASE_URL()}/static/images/SJ_2.jpg",
-                detail_data="room_detail_sj",
-                book_data="book_room"
-            ),
-            room_card(
-                title='ห้องพักโซน "เติมสุข"',
-                price="590 บาท / คืน",
-                image_url=f"{BASE_URL()}/static/images/TS_3.jpg",
-                detail_data="room_detail_ts",
-                book_data="book_room"
-            ),
-            room_card(
-                title='ห้องพักโซน "ก่อสุข"',
-                price="690 บาท / คืน",
-                image_url=f"{BASE_URL()}/static/images/KS_4.jpg",
-                detail_data="room_detail_ks",
-                book_data="book_room"
-            )
-        ]
-    }
 
+# intent ที่ไม่มี alias ใน catalog เลือกจาก session (follow_up)
+RESUME_BOOKING = Intent("book_resume", handler=resume_booking_intent)
+CONTACT_MESSAGE = Intent("contact_message", handler=contact_message_intent)
 
-def room_card(title, price, image_url, detail_data, book_data):
-    return {
-        "type": "bubble",
-        "hero": {
-            "type": "image",
-            "url": image_url,
-            "size": "full",
-            "aspectRatio": "20:13",
-            "aspectMode": "cover"
-        },
-        "body": {
-            "type": "box",
-            "layout": "vertical",
-            "contents": [
-                {"type": "text", "text": title, "weight": "bold", "size": "lg"},
-                {"type": "text", "text": price, "color": "#666666"}
-            ]
-        },
-        "footer": {
-            "type": "box",
-            "layout": "horizontal",
-            "contents": [
-                {
-                    "type": "button",
-                    "action": {
-                        "type": "postback",
-                        "label": "ข้อมูลเพิ่มเติม",
-                        "data": detail_data
-                    }
-                },
-                {
-                    "type": "button",
-                    "style": "primary",
-                    "action": {
-                        "type": "postback",
-                        "label": "จองห้องพัก",
-                        "data": book_data
-                    }
-                }
-            ]
-        }
-    }
+
+# @handler("room_detail")
+# def room_detail_intent(event, plan):
+#     line_bot_api.reply_message(
+#         event.reply_token,
+#         TextSendMessage(
+#             text="🛎 ห้องพักมี แอร์ / น้ำอุ่น / Wi-Fi / ทีวี / ตู้เย็น"
+#         )
+#     )
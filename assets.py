@@ -0,0 +1,215 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+
+# Pillow โหลดตอน build เท่านั้น (ไม่ช้าตอน start)
+Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIR = os.path.join("static", "images")
+DERIVED_DIR = os.path.join("static", "derived")
+MANIFEST = os.path.join(DERIVED_DIR, "manifest.json")
+
+# LINE แนะนำ preview ไม่เกิน 240px / original ไม่เกิน 10MB (รองรับแค่ JPEG, PNG)
+PREVIEW_EDGE = int(os.getenv("ASSET_PREVIEW_EDGE", "240"))
+MAX_EDGE = int(os.getenv("ASSET_MAX_EDGE", "1280"))
+MAX_BYTES = int(os.getenv("ASSET_MAX_BYTES", str(300 * 1024)))
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+# เปลี่ยนค่าพวกนี้ = ต้อง build ใหม่ทั้งหมด
+SETTINGS = f"v1:{PREVIEW_EDGE}:{MAX_EDGE}:{MAX_BYTES}"
+
+
+# ชื่อที่โค้ดใช้อ้างอิง เช่น "TS_1 .jpg" -> "TS_1.jpg"
+def logical_name(filename):
+    return filename.replace(" ", "")
+
+
+def _sha256(path):
+    h = hashlib.sha256(SETTINGS.encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _encode(image, edge, max_bytes, quality=85):
+    image = image.copy()
+    image.thumbnail((edge, edge), Image.LANCZOS)
+    while True:
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+        if out.tell() <= max_bytes or quality <= 55:
+            return out.getvalue()
+        quality -= 10
+
+
+def _open(path):
+    image = ImageOps.exif_transpose(Image.open(path))
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _write(name, data):
+    path = os.path.join(DERIVED_DIR, name)
+    with open(path, "wb") as f:
+        f.write(data)
+    return os.path.relpath(path, "static").replace(os.sep, "/")
+
+
+def _remove(entry):
+    for key in ("original", "preview"):
+        path = os.path.join("static", entry[key])
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# =====================
+# BUILD
+# ทำ preview + original ที่ย่อขนาดแล้ว เฉพาะไฟล์ที่ content hash เปลี่ยน
+# =====================
+def _load_pillow():
+    global Image, ImageOps
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return False
+    return True
+
+
+def build():
+    if not _load_pillow():
+        raise RuntimeError("Pillow is required to build image derivatives")
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    old = load_manifest()
+    manifest = {}
+    built = 0
+
+    for filename in sorted(os.listdir(SOURCE_DIR)):
+        if not filename.lower().endswith(IMAGE_EXTS):
+            continue
+        name = logical_name(filename)
+        source = os.path.join(SOURCE_DIR, filename)
+        digest = _sha256(source)
+        entry = old.get(name)
+        if entry and entry["sha256"] == digest and all(
+            os.path.exists(os.path.join("static", entry[k])) for k in ("original", "preview")
+        ):
+            manifest[name] = entry
+            continue
+        if entry:
+            _remove(entry)
+
+        stem = os.path.splitext(name)[0]
+        tag = digest[:10]
+        image = _open(source)
+        original = _encode(image, MAX_EDGE, MAX_BYTES)
+        if filename.lower().endswith((".jpg", ".jpeg")) and max(image.size) <= MAX_EDGE \
+                and os.path.getsize(source) <= len(original):
+            # ต้นฉบับเล็กกว่าที่ encode ใหม่อยู่แล้ว ใช้ไฟล์เดิม
+            with open(source, "rb") as f:
+                original = f.read()
+        manifest[name] = {
+            "sha256": digest,
+            "original": _write(f"{stem}.{tag}.jpg", original),
+            "preview": _write(f"{stem}.{tag}.preview.jpg", _encode(image, PREVIEW_EDGE, MAX_BYTES)),
+        }
+        built += 1
+
+    for name, entry in old.items():
+        if name not in manifest:
+            _remove(entry)
+
+    # ไม่มีอะไรเปลี่ยน -> ไม่เขียน manifest ใหม่ (mtime เดิม = catalog ไม่ต้อง compile ใหม่)
+    if manifest != old or not os.path.exists(MANIFEST):
+        tmp = MANIFEST + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, MANIFEST)
+    return built, len(manifest)
+
+
+def build_if_available():
+    if not _load_pillow():
+        logger.warning("Pillow not installed, serving original images")
+        return
+    try:
+        built, total = build()
+        logger.info("image derivatives: %d rebuilt, %d total", built, total)
+    except Exception:
+        logger.exception("image derivative build failed, serving original images")
+
+
+# =====================
+# LOOKUP (โหลด manifest ใหม่อัตโนมัติเมื่อไฟล์เปลี่ยน)
+# =====================
+class Assets:
+    def __init__(self):
+        self.manifest = {}
+        self.mtime = None
+
+    def _load(self):
+        try:
+            mtime = os.stat(MANIFEST).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self.mtime:
+            self.mtime = mtime
+            self.manifest = load_manifest()
+        return self.manifest
+
+    # ยังไม่มี manifest (build ไม่เสร็จ / ไม่มี Pillow) -> ไฟล์ต้นฉบับชื่อจริงบน disk
+    def paths(self, name):
+        entry = self._load().get(name)
+        if entry is None:
+            path = f"images/{self.source(name) or name}"
+            return path, path
+        return entry["original"], entry["preview"]
+
+    # ชื่อไฟล์ต้นฉบับจริงของชื่อใน catalog ("TS_1.jpg" -> "TS_1 .jpg") ไม่มี -> None
+    def source(self, name):
+        try:
+            return next((f for f in os.listdir(SOURCE_DIR) if logical_name(f) == name), None)
+        except OSError:
+            return None
+
+    # มีภาพนี้จริงไหม (derivative ใน manifest หรือไฟล์ต้นฉบับ เช่น "TS_1 .jpg")
+    def exists(self, name):
+        return name in self._load() or self.source(name) is not None
+
+    # derivative ปัจจุบันของภาพ (ใช้ตอนมีคนขอ URL ที่มี hash เก่า)
+    def current(self, stem, preview=False):
+        for name, entry in self._load().items():
+            if os.path.splitext(name)[0] == stem:
+                return entry["preview" if preview else "original"]
+        return None
+
+
+def clean():
+    shutil.rmtree(DERIVED_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:] == ["clean"]:
+        clean()
+    else:
+        built, total = build()
+        print(f"{built} rebuilt, {total} total -> {MANIFEST}")
@@ -0,0 +1,147 @@
+# =====================
+# BOOKING ENGINE
+#   python bench/booking.py                      -> ทั้ง 2 แบบ
+#   python bench/booking.py --processes 4 --threads 8 --attempts 200
+#
+# 1) availability: bitset ใน memory vs query SQL หาช่วงที่ทับกัน (ข้อมูลชุดเดียวกัน)
+# 2) concurrency: หลาย process x หลาย thread แย่ง hold ห้องช่วงวันเดียวกัน
+#    แล้วตรวจจาก SQLite ว่าไม่มีห้องไหนถูกจองซ้อน
+# =====================
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from booking import CONFIRMED, HOLD, BookingEngine  # noqa: E402
+
+
+def rooms_for(zones, per_zone):
+    return {f"z{z}": tuple(f"z{z}-{r}" for r in range(per_zone)) for z in range(zones)}
+
+
+def random_range(rng, days, max_nights):
+    check_in = date.today() + timedelta(days=rng.randrange(days))
+    return check_in, check_in + timedelta(days=rng.randint(1, max_nights))
+
+
+def sql_availability(db, rooms, check_in, check_out):
+    # ห้องที่มี booking ทับช่วงนี้ = check_in < ออก และ check_out > เข้า
+    busy = {r for (r,) in db.execute(
+        "SELECT DISTINCT room FROM bookings WHERE check_out > ? AND check_in < ?"
+        " AND (status = ? OR (status = ? AND expires_at > ?))",
+        (check_in.isoformat(), check_out.isoformat(), CONFIRMED, HOLD, time.time()),
+    )}
+    return {zone: sum(1 for r in rs if r not in busy) for zone, rs in rooms.items()}
+
+
+def bench_queries(args, path):
+    rooms = rooms_for(args.zones, args.rooms)
+    engine = BookingEngine(path, hold_ttl=86400)
+    engine.use_rooms(rooms)
+    rng = random.Random(1)
+    # 1 user hold ได้ทีละ 1 ห้อง -> user ต่างกันทุก booking ให้ index เต็มจริง
+    for i in range(args.bookings):
+        check_in, check_out = random_range(rng, 330, 7)
+        engine.hold(rng.choice(list(rooms)), check_in, check_out, f"bench-{i}")
+    queries = [random_range(rng, 330, 7) for _ in range(args.queries)]
+
+    db = sqlite3.connect(path)
+    mismatches = sum(
+        1 for ci, co in queries[:200] if engine.availability(ci, co) != sql_availability(db, rooms, ci, co)
+    )
+    print(f"availability: {args.zones} zones x {args.rooms} rooms, {engine.holds} bookings, "
+          f"mismatches {mismatches}/200")
+    for label, fn in (
+        ("sql", lambda ci, co: sql_availability(db, rooms, ci, co)),
+        ("bitset", engine.availability),
+    ):
+        start = time.perf_counter()
+        for ci, co in queries:
+            fn(ci, co)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>8}: {len(queries) / elapsed:10.0f} q/s  {elapsed / len(queries) * 1e6:8.1f} us/q")
+
+
+def worker(path, rooms, seed, threads, attempts, days, results):
+    engine = BookingEngine(path)
+    engine.use_rooms(rooms)
+    held = [0]
+
+    def run(n):
+        rng = random.Random(seed * 1000 + n)
+        for i in range(attempts):
+            check_in, check_out = random_range(rng, days, 3)
+            if engine.hold(rng.choice(list(rooms)), check_in, check_out, f"u{seed}-{n}-{i}") is not None:
+                held[0] += 1
+
+    pool = [threading.Thread(target=run, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    results.put((held[0], engine.conflicts, engine.full))
+
+
+def bench_concurrency(args, path):
+    rooms = rooms_for(args.zones, args.rooms)
+    BookingEngine(path).use_rooms(rooms)
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    start = time.perf_counter()
+    procs = [
+        ctx.Process(target=worker, args=(path, rooms, p, args.threads, args.attempts, args.days, results))
+        for p in range(args.processes)
+    ]
+    for p in procs:
+        p.start()
+    totals = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    held = sum(t[0] for t in totals)
+    attempts = args.processes * args.threads * args.attempts
+    db = sqlite3.connect(path)
+    overlaps = db.execute(
+        "SELECT COUNT(*) FROM bookings a JOIN bookings b"
+        " ON a.room = b.room AND a.id < b.id AND a.check_in < b.check_out AND b.check_in < a.check_out"
+        " WHERE a.status IN (?, ?) AND b.status IN (?, ?)",
+        (HOLD, CONFIRMED, HOLD, CONFIRMED),
+    ).fetchone()[0]
+    print(f"concurrency: {args.processes} processes x {args.threads} threads, "
+          f"{attempts} attempts over {args.days} days")
+    print(f"  {attempts / elapsed:8.0f} attempts/s  {held / elapsed:8.0f} holds/s  "
+          f"held {held}  full {sum(t[2] for t in totals)}  conflicts {sum(t[1] for t in totals)}")
+    print(f"  double-booked pairs: {overlaps}")
+    return overlaps
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--zones", type=int, default=3)
+    ap.add_argument("--rooms", type=int, default=4, help="rooms per zone")
+    ap.add_argument("--bookings", type=int, default=2000)
+    ap.add_argument("--queries", type=int, default=5000)
+    ap.add_argument("--processes", type=int, default=4)
+    ap.add_argument("--threads", type=int, default=4)
+    ap.add_argument("--attempts", type=int, default=100, help="holds per thread")
+    ap.add_argument("--days", type=int, default=14, help="small range = more contention")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_queries(args, os.path.join(tmp, "queries.sqlite3"))
+        overlaps = bench_concurrency(args, os.path.join(tmp, "concurrency.sqlite3"))
+    sys.exit(1 if overlaps else 0)
+
+
+if __name__ == "__main__":
+    main()
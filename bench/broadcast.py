@@ -0,0 +1,81 @@
+# =====================
+# BROADCAST: multicast job กับ fake LINE API (offline)
+#   python bench/broadcast.py --followers 20000
+#   python bench/broadcast.py --followers 20000 --crash-after 1.5 --rate-5xx 0.05
+#
+# sync-followers -> send (kill กลางทางถ้าตั้ง --crash-after) -> send ซ้ำด้วย job เดิม
+# แล้วตรวจจาก fake API ว่าทุกคนได้รับครบ และไม่มีใครได้ซ้ำ
+# =====================
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import ROOT, app_env, fake_line_api, get_json, stop
+
+
+def run(env, *args):
+    return subprocess.Popen([sys.executable, os.path.join(ROOT, "broadcast.py"), *args], cwd=ROOT, env=env)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--followers", type=int, default=20000)
+    ap.add_argument("--reply", default="coffee_promo")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--rate", type=float, default=200)
+    ap.add_argument("--latency-ms", type=float, default=100)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--rate-5xx", type=float, default=0.0)
+    ap.add_argument("--crash-after", type=float, default=0, help="kill the first send after N seconds")
+    args = ap.parse_args()
+
+    # fake API อ่านจำนวน follower จาก env ของ process
+    os.environ["FAKE_LINE_FOLLOWERS"] = str(args.followers)
+    api, api_port = fake_line_api(args.latency_ms, rate_429=args.rate_429, rate_5xx=args.rate_5xx)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**os.environ, **app_env(api_port, {
+                "FOLLOWERS_DB": os.path.join(tmp, "followers.sqlite3"),
+                "BOOKING_DB": os.path.join(tmp, "bookings.sqlite3"),
+                "HOUSEKEEPING_DB": os.path.join(tmp, "housekeeping.sqlite3"),
+                "HOUSEKEEPING_LOG": os.path.join(tmp, "housekeeping.log"),
+                "CATALOG_SNAPSHOT": "",
+            })}
+            run(env, "sync-followers").wait()
+
+            send = ("send", "--job", "bench", "--reply", args.reply,
+                    "--concurrency", str(args.concurrency), "--rate", str(args.rate), "--progress-every", "10")
+            started = time.perf_counter()
+            proc = run(env, *send)
+            if args.crash_after:
+                time.sleep(args.crash_after)
+                proc.kill()
+                proc.wait()
+                print(f"-- killed after {args.crash_after}s, resuming")
+                proc = run(env, *send)
+            proc.wait()
+            elapsed = time.perf_counter() - started
+
+            stats = get_json(api_port, "/stats")
+            multicast = stats["multicast"]
+            print(json.dumps({
+                "followers": args.followers,
+                "seconds": round(elapsed, 2),
+                "recipients_per_second": round(multicast["unique_recipients"] / elapsed),
+                "multicast_calls": stats["calls"].get("multicast", 0),
+                "status": stats["status"],
+                **multicast,
+            }, indent=2))
+            ok = multicast["unique_recipients"] == args.followers and not multicast["duplicate_deliveries"]
+            print("all delivered exactly once" if ok else "MISMATCH")
+            sys.exit(0 if ok else 1)
+    finally:
+        stop(api)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# =====================
+# COLD START: เวลาตั้งแต่ start process จนตอบ webhook แรกได้ (เหมือน instance บน Render ตื่นจาก sleep)
+#   python bench/cold_start.py --runs 5
+#   python bench/cold_start.py --modes fast,full --fresh   (ลบ static/derived + snapshot ก่อนทุกรอบ)
+# =====================
+import argparse
+import http.client
+import os
+import shutil
+import statistics
+import time
+
+from harness import ROOT, app_env, free_port, fake_line_api, generate, get_json, serve, stop
+
+
+def first_response(port, body, signature, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+            conn.request("POST", "/webhook", body, {
+                "Content-Type": "application/json",
+                "X-Line-Signature": signature,
+            })
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError("app did not answer the first webhook")
+
+
+def fresh():
+    shutil.rmtree(os.path.join(ROOT, "static", "derived"), ignore_errors=True)
+    snapshot = os.path.join(ROOT, "catalog.compiled")
+    if os.path.exists(snapshot):
+        os.remove(snapshot)
+
+
+def run(mode, args, api_port):
+    _, body, signature = generate(1, {args.intent: 1})[0]
+    totals = []
+    for _ in range(args.runs):
+        if args.fresh:
+            fresh()
+        port = free_port()
+        started = time.perf_counter()
+        proc = serve("app:app", port, app_env(api_port, {
+            "STARTUP_MODE": mode,
+            "ASSET_BUILD_ON_STARTUP": "1",
+        }))
+        try:
+            status = first_response(port, body, signature)
+            totals.append((time.perf_counter() - started) * 1000)
+            report = get_json(port, "/debug/startup")
+        finally:
+            stop(proc)
+        if status != 200:
+            raise RuntimeError(f"first webhook returned {status}")
+
+    print(f"{mode:>5}: time-to-first-webhook median {statistics.median(totals):7.1f} ms  "
+          f"min {min(totals):7.1f}  max {max(totals):7.1f}")
+    # breakdown ของรอบสุดท้าย
+    print(f"       before app import {report['process_to_app_import_ms']} ms, "
+          f"stages {report['stages_ms']}")
+    print(f"       ready {report['ready_ms']} ms, first webhook {report['first_webhook_ms']} ms "
+          f"(handling {report['first_webhook_handling_ms']} ms), "
+          f"catalog from snapshot: {report['catalog']['from_snapshot']}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--modes", default="fast,full")
+    ap.add_argument("--intent", default="rooms")
+    ap.add_argument("--latency-ms", type=float, default=0)
+    ap.add_argument("--fresh", action="store_true",
+                    help="delete static/derived and the catalog snapshot before every run")
+    args = ap.parse_args()
+
+    api, api_port = fake_line_api(args.latency_ms)
+    try:
+        for mode in args.modes.split(","):
+            run(mode, args, api_port)
+    finally:
+        stop(api)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# =====================
+# INTENT DISPATCH: registry vs if/elif list scan
+#   python bench/dispatch.py --messages 300000
+# =====================
+import argparse
+import os
+import random
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LINE_CHANNEL_SECRET", "bench-secret")
+os.environ.setdefault("LINE_CHANNEL_ACCESS_TOKEN", "bench-token")
+warnings.filterwarnings("ignore")
+
+import app  # noqa: E402
+
+SAMPLES = [
+    "1", "2.", "3", "4", "5", "6", "wifi", "WiFi ", "ราคา", "๕", "๑.",
+    "uland coffee", "contact", "ติดต่อสอบถาม", "6 ทำความสะอาดห้องพัก",
+    "wifiค่ะ", "ราคาเท่าไหร่คะ", "สวัสดีค่ะ", "hello", "10", "​4",
+]
+
+
+# แบบเดิม: strip().lower() แล้วไล่ `in [...]` ทีละ branch
+def linear_table():
+    table = {}
+    for alias, handler in app.catalog.get().text_intents.exact.items():
+        table.setdefault(handler, []).append(alias)
+    return list(table.items())
+
+
+def linear_match(rows, text):
+    text = text.strip().lower()
+    for handler, aliases in rows:
+        if text in aliases:
+            return handler
+    return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=300000)
+    args = ap.parse_args()
+
+    rng = random.Random(1)
+    messages = [rng.choice(SAMPLES) for _ in range(args.messages)]
+    rows = linear_table()
+
+    for label, match in (
+        ("if/elif", lambda t: linear_match(rows, t)),
+        ("registry", app.catalog.get().text_intents.match),
+    ):
+        start = time.perf_counter()
+        matched = sum(1 for t in messages if match(t) is not None)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>9}: {args.messages / elapsed:10.0f} msg/s  "
+              f"{elapsed / args.messages * 1e6:6.2f} us/msg  matched {matched}")
+
+
+if __name__ == "__main__":
+    main()
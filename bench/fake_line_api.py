@@ -0,0 +1,129 @@
+# =====================
+# FAKE LINE MESSAGING API
+# ใช้แทน https://api.line.me ตอนทดสอบ / benchmark แบบ offline
+#   uvicorn --app-dir bench fake_line_api:app --port 9000
+#
+# harness ตั้ง replyToken / userId เป็น "R.<intent>.<n>" / "U.<intent>.<n>"
+# เพื่อให้นับ outbound call แยกตาม intent ได้ (GET /stats)
+#
+# multicast: เคารพ X-Line-Retry-Key (key เดิม -> 409) และนับผู้รับไม่ซ้ำ
+# FAKE_LINE_FOLLOWERS=N -> /v2/bot/followers/ids คืน follower ปลอม N คน
+# =====================
+import asyncio
+import os
+import random
+import uuid
+from collections import Counter
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+LATENCY = float(os.getenv("FAKE_LINE_LATENCY_MS", "100")) / 1000
+JITTER = float(os.getenv("FAKE_LINE_JITTER_MS", "0")) / 1000
+RATE_429 = float(os.getenv("FAKE_LINE_429_RATE", "0"))
+RATE_5XX = float(os.getenv("FAKE_LINE_5XX_RATE", "0"))
+FOLLOWERS = int(os.getenv("FAKE_LINE_FOLLOWERS", "0"))
+
+app = FastAPI()
+calls = Counter()
+by_intent = Counter()
+statuses = Counter()
+messages = Counter()
+retry_keys = {}
+recipients = Counter()
+
+
+def _intent(value):
+    parts = str(value).split(".")
+    return parts[1] if len(parts) >= 3 else "other"
+
+
+async def _call(name, target=None, body=None):
+    calls[name] += 1
+    if target is not None:
+        by_intent[f"{_intent(target)}:{name}"] += 1
+    if body is not None:
+        messages[name] += len(body.get("messages", ()))
+    await asyncio.sleep(LATENCY + (random.expovariate(1 / JITTER) if JITTER else 0))
+    roll = random.random()
+    if roll < RATE_429:
+        statuses["429"] += 1
+        raise HTTPException(429, "The API rate limit has been exceeded.")
+    if roll < RATE_429 + RATE_5XX:
+        statuses["500"] += 1
+        raise HTTPException(500, "Internal server error")
+    statuses["200"] += 1
+    return {}
+
+
+@app.post("/v2/bot/message/reply")
+async def reply(request: Request):
+    body = await request.json()
+    return await _call("reply_message", body.get("replyToken"), body)
+
+
+@app.post("/v2/bot/message/push")
+async def push(request: Request):
+    body = await request.json()
+    return await _call("push_message", body.get("to"), body)
+
+
+@app.post("/v2/bot/message/multicast")
+async def multicast(request: Request):
+    body = await request.json()
+    to = body.get("to", ())
+    if not 0 < len(to) <= 500:
+        raise HTTPException(400, "The number of recipients must be between 1 and 500")
+    key = request.headers.get("X-Line-Retry-Key")
+    if key in retry_keys:
+        statuses["409"] += 1
+        return JSONResponse(
+            {"message": "The retry key is already accepted"}, status_code=409,
+            headers={"X-Line-Accepted-Request-Id": retry_keys[key]},
+        )
+    await _call("multicast", to[0], body)
+    request_id = str(uuid.uuid4())
+    if key:
+        retry_keys[key] = request_id
+    messages["multicast_recipients"] += len(to)
+    recipients.update(to)
+    return JSONResponse({}, headers={"X-Line-Request-Id": request_id})
+
+
+@app.get("/v2/bot/followers/ids")
+async def followers(limit: int = 300, start: str = None):
+    await _call("get_followers_ids")
+    first = int(start or 0)
+    last = min(first + limit, FOLLOWERS)
+    page = {"userIds": [f"U{i:032x}" for i in range(first, last)]}
+    if last < FOLLOWERS:
+        page["next"] = str(last)
+    return page
+
+
+@app.get("/v2/bot/profile/{user_id}")
+async def profile(user_id: str):
+    await _call("get_profile", user_id)
+    return {"userId": user_id, "displayName": "Guest " + user_id[-4:]}
+
+
+@app.get("/stats")
+def stats():
+    return {
+        "calls": dict(calls),
+        "by_intent": dict(by_intent),
+        "status": dict(statuses),
+        "messages": dict(messages),
+        "multicast": {
+            "unique_recipients": len(recipients),
+            "duplicate_deliveries": sum(n - 1 for n in recipients.values() if n > 1),
+        },
+    }
+
+
+@app.post("/reset")
+def reset():
+    for counter in (calls, by_intent, statuses, messages, recipients):
+        counter.clear()
+    retry_keys.clear()
+    return {}
@@ -0,0 +1,382 @@
+# =====================
+# LOAD-TEST HARNESS
+# ยิง webhook ที่ sign ถูกต้องใส่ app ตาม rate ที่กำหนด โดยมี fake LINE API รันอยู่ข้างหลัง
+#
+#   python bench/harness.py --rate 50 --duration 20 --output results/main.json
+#   python bench/harness.py --mix wifi=5,coffee=1 --latency-ms 150 --rate-429 0.02
+#   python bench/harness.py --app-env WEBHOOK_MODE=queue --label queue
+#
+# ผลลัพธ์ (JSON) มี throughput, latency percentile, status และ outbound call แยกตาม intent
+# =====================
+import argparse
+import atexit
+import base64
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET = "bench-secret"
+
+# intent -> (event type, text / postback data)
+INTENTS = {
+    "rooms": ("text", "1"),
+    "resort_images": ("text", "2"),
+    "map": ("text", "3"),
+    "wifi": ("text", "4"),
+    "coffee": ("text", "5"),
+    "cleaning": ("text", "6"),
+    "contact": ("text", "contact"),
+    "unmatched": ("text", "สวัสดีค่ะ"),
+    "rooms_postback": ("postback", "rooms"),
+    "location": ("postback", "location"),
+    "room_detail_sj": ("postback", "room_detail_sj"),
+    "room_detail_ts": ("postback", "room_detail_ts"),
+    "room_detail_ks": ("postback", "room_detail_ks"),
+    "book_room": ("postback", "book_room"),
+}
+DEFAULT_MIX = "wifi=4,rooms=3,coffee=2,room_detail_ts=1,room_detail_ks=1,contact=1,map=1"
+
+# ปิด rate limit ของ app ระหว่าง benchmark (ไม่งั้นวัดได้แต่ request ที่โดน shed)
+BENCH_APP_ENV = {
+    "RATE_LIMITS": "default=1000000/1",
+    "RATE_COLLAPSE_WINDOW": "0",
+    "ASSET_BUILD_ON_STARTUP": "0",
+}
+_state_dir = None
+
+
+# ไฟล์ที่ app เขียน (housekeeping log, SQLite, snapshot) ไปอยู่ใน temp dir ของ benchmark
+# ไม่ปน traffic ปลอมเข้าไฟล์จริงใน ROOT ลบทิ้งเมื่อ benchmark จบ
+def state_dir():
+    global _state_dir
+    if _state_dir is None:
+        _state_dir = tempfile.mkdtemp(prefix="bench-state-")
+        atexit.register(shutil.rmtree, _state_dir, True)
+    return _state_dir
+
+
+def state_env():
+    tmp = state_dir()
+    return {
+        "BOOKING_DB": os.path.join(tmp, "bookings.sqlite3"),
+        "HOUSEKEEPING_DB": os.path.join(tmp, "housekeeping.sqlite3"),
+        "HOUSEKEEPING_LOG": os.path.join(tmp, "housekeeping.log"),
+        "FOLLOWERS_DB": os.path.join(tmp, "followers.sqlite3"),
+        "CATALOG_SNAPSHOT": os.path.join(tmp, "catalog.compiled"),
+    }
+
+
+# =====================
+# PROCESS HELPERS
+# =====================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def serve(target, port, env, app_dir=ROOT, extra_args=()):
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--app-dir", app_dir, target,
+         "--port", str(port), "--log-level", "warning", *extra_args],
+        cwd=ROOT, env={**os.environ, **env},
+    )
+
+
+def stop(proc):
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def fake_line_api(latency_ms=100, jitter_ms=0, rate_429=0.0, rate_5xx=0.0):
+    port = free_port()
+    proc = serve("fake_line_api:app", port, {
+        "FAKE_LINE_LATENCY_MS": str(latency_ms),
+        "FAKE_LINE_JITTER_MS": str(jitter_ms),
+        "FAKE_LINE_429_RATE": str(rate_429),
+        "FAKE_LINE_5XX_RATE": str(rate_5xx),
+    }, app_dir=os.path.join(ROOT, "bench"))
+    wait_ready(port)
+    return proc, port
+
+
+def app_env(api_port, env=None):
+    return {
+        "LINE_CHANNEL_SECRET": SECRET,
+        "LINE_CHANNEL_ACCESS_TOKEN": "bench-token",
+        "LINE_API_ENDPOINT": f"http://127.0.0.1:{api_port}",
+        **BENCH_APP_ENV,
+        **state_env(),
+        **(env or {}),
+    }
+
+
+def app_server(api_port, env=None, extra_args=()):
+    port = free_port()
+    proc = serve("app:app", port, app_env(api_port, env), extra_args=extra_args)
+    wait_ready(port)
+    return proc, port
+
+
+def get_json(port, path, method="GET"):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request(method, path)
+    return json.loads(conn.getresponse().read() or b"{}")
+
+
+# =====================
+# WEBHOOK BODIES (HMAC-SHA256 + base64 แบบเดียวกับ WebhookParser)
+# =====================
+def sign(body, secret=SECRET):
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+def make_event(intent, n, user):
+    kind, value = INTENTS[intent]
+    event = {
+        "type": "message" if kind == "text" else "postback",
+        "mode": "active",
+        "timestamp": int(time.time() * 1000),
+        "source": {"type": "user", "userId": f"U.{intent}.{user}"},
+        "replyToken": f"R.{intent}.{n}",
+        "webhookEventId": f"E{n:012d}",
+        "deliveryContext": {"isRedelivery": False},
+    }
+    if kind == "text":
+        event["message"] = {"type": "text", "id": str(n), "text": value}
+    else:
+        event["postback"] = {"data": value}
+    return event
+
+
+def make_body(events, secret=SECRET):
+    body = json.dumps({"destination": "Ubench", "events": events}, ensure_ascii=False).encode()
+    return body, sign(body, secret)
+
+
+def parse_mix(spec):
+    mix = {}
+    for item in spec.split(","):
+        name, weight = item.split("=")
+        if name not in INTENTS:
+            raise SystemExit(f"unknown intent {name!r}, choose from {', '.join(INTENTS)}")
+        mix[name] = float(weight)
+    return mix
+
+
+def generate(count, mix, events_per_request=1, users=1000, seed=1):
+    rng = random.Random(seed)
+    names, weights = zip(*mix.items())
+    requests = []
+    n = 0
+    for _ in range(count):
+        events = []
+        intents = []
+        for _ in range(events_per_request):
+            intent = rng.choices(names, weights)[0]
+            events.append(make_event(intent, n, rng.randrange(users)))
+            intents.append(intent)
+            n += 1
+        requests.append((intents, *make_body(events)))
+    return requests
+
+
+# =====================
+# REPLAY (open loop: latency นับจากเวลาที่ควรส่ง ไม่ใช่เวลาที่ได้ส่งจริง)
+# =====================
+def post(port, body, signature, conn_cache=threading.local()):
+    conn = getattr(conn_cache, "conn", None)
+    if conn is None or conn_cache.port != port:
+        conn = conn_cache.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        conn_cache.port = port
+    try:
+        conn.request("POST", "/webhook", body, {
+            "Content-Type": "application/json",
+            "X-Line-Signature": signature,
+        })
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    except (OSError, http.client.HTTPException):
+        conn.close()
+        conn_cache.conn = None
+        return 0
+
+
+def replay(port, requests, rate, concurrency=64):
+    results = [None] * len(requests)
+    start = time.perf_counter() + 0.1
+
+    def fire(i):
+        scheduled = start + i / rate if rate else time.perf_counter()
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        status = post(port, requests[i][1], requests[i][2])
+        results[i] = (time.perf_counter() - scheduled, status)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(fire, range(len(requests))))
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def summarize(requests, results, elapsed):
+    latencies = sorted(r[0] * 1000 for r in results)
+    per_intent = Counter()
+    for intents, _, _ in requests:
+        per_intent.update(intents)
+    return {
+        "requests": len(results),
+        "events": sum(per_intent.values()),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2),
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p90": round(percentile(latencies, 0.90), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "status": dict(Counter(str(r[1]) for r in results)),
+        "events_per_intent": dict(per_intent),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    mix = parse_mix(args.mix)
+    count = args.requests or int(args.rate * args.duration)
+    requests = generate(count, mix, args.events_per_request, args.users, args.seed)
+    app_env = dict(kv.split("=", 1) for kv in args.app_env)
+
+    api, api_port = fake_line_api(args.latency_ms, args.jitter_ms, args.rate_429, args.rate_5xx)
+    try:
+        app, port = app_server(api_port, app_env)
+        try:
+            results, elapsed = replay(port, requests, args.rate, args.concurrency)
+            # queue mode ตอบ 200 ก่อนส่งจริง รอให้ worker ส่งให้หมดก่อนเก็บสถิติ
+            time.sleep(args.settle)
+        finally:
+            stop(app)
+        outbound = get_json(api_port, "/stats")
+    finally:
+        stop(api)
+
+    report = summarize(requests, results, elapsed)
+    report["outbound"] = outbound
+    report["outbound_calls_per_event"] = round(
+        sum(v for k, v in outbound["calls"].items()) / max(report["events"], 1), 3
+    )
+    return {
+        "label": args.label,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "mix": mix,
+            "rate": args.rate,
+            "requests": count,
+            "events_per_request": args.events_per_request,
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "rate_429": args.rate_429,
+            "rate_5xx": args.rate_5xx,
+            "app_env": app_env,
+        },
+        "results": report,
+    }
+
+
+def print_report(report):
+    r = report["results"]
+    lat = r["latency_ms"]
+    print(f"[{report['label']}] {r['requests']} requests / {r['events']} events "
+          f"in {r['elapsed_s']} s -> {r['throughput_rps']} req/s")
+    print(f"  latency ms: p50 {lat['p50']}  p90 {lat['p90']}  p99 {lat['p99']}  max {lat['max']}")
+    print(f"  status: {r['status']}")
+    print(f"  outbound calls: {r['outbound']['calls']} "
+          f"({r['outbound_calls_per_event']} per event)")
+    for key, value in sorted(r["outbound"]["by_intent"].items()):
+        print(f"    {key:<32} {value}")
+
+
+def add_arguments(ap):
+    ap.add_argument("--label", default="run")
+    ap.add_argument("--mix", default=DEFAULT_MIX)
+    ap.add_argument("--rate", type=float, default=50, help="requests per second (0 = as fast as possible)")
+    ap.add_argument("--duration", type=float, default=10)
+    ap.add_argument("--requests", type=int, default=0, help="overrides rate * duration")
+    ap.add_argument("--events-per-request", type=int, default=1)
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--latency-ms", type=float, default=100)
+    ap.add_argument("--jitter-ms", type=float, default=0)
+    ap.add_argument("--rate-429", type=float, default=0)
+    ap.add_argument("--rate-5xx", type=float, default=0)
+    ap.add_argument("--settle", type=float, default=1.0)
+    ap.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE")
+    ap.add_argument("--output")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    add_arguments(ap)
+    args = ap.parse_args()
+    report = run(args)
+    print_report(report)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"  saved -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
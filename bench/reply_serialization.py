@@ -0,0 +1,69 @@
+# =====================
+# PER-EVENT SERIALIZATION COST: SDK models vs cached reply catalog
+#   python bench/reply_serialization.py --events 2000
+# =====================
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault("LINE_CHANNEL_SECRET", "bench-secret")
+os.environ.setdefault("LINE_CHANNEL_ACCESS_TOKEN", "bench-token")
+warnings.filterwarnings("ignore")
+
+import app  # noqa: E402
+from catalog import build_messages  # noqa: E402
+from transport import _messages  # noqa: E402
+
+INTENTS = ["room_cards", "coffee", "room_detail_ks", "wifi"]
+
+
+MESSAGES = {}
+
+
+# เหมือนที่ LineBotApi.reply_message ทำทุกครั้ง
+def sdk_path(name):
+    messages = MESSAGES[name]
+    return json.dumps({
+        "replyToken": "token",
+        "messages": [m.as_json_dict() for m in messages],
+        "notificationDisabled": False,
+    }).encode()
+
+
+def catalog_path(name):
+    return b'{"replyToken":"token","messages":' + _messages(app.catalog.get().replies[name]) + b"}"
+
+
+def measure(fn, events):
+    names = [INTENTS[i % len(INTENTS)] for i in range(events)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    for name in names:
+        fn(name)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / events * 1e6, peak / 1024
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=2000)
+    args = ap.parse_args()
+
+    content = app.catalog.reload()
+    MESSAGES.update(build_messages(content.data, app.media))
+    for label, fn in (("sdk", sdk_path), ("catalog", catalog_path)):
+        per_event, peak = measure(fn, args.events)
+        print(f"{label:>8}: {per_event:8.2f} us/event  peak {peak:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
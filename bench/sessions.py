@@ -0,0 +1,93 @@
+# =====================
+# SESSIONS: memory ต่อ session และ throughput ของ get/save
+#   python bench/sessions.py --users 50000
+#   python bench/sessions.py --users 50000 --maxsize 10000 --state sqlite
+#
+# เทียบ Session (__slots__) กับ dict ธรรมดาที่เก็บค่าเดียวกัน (วัดด้วย tracemalloc)
+# แล้วยิง get/save ตาม traffic ที่ user ส่วนน้อยคุยบ่อย (ซ้ำ user เดิม)
+# =====================
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sessions import Session, SessionStore  # noqa: E402
+from shared_state import open_state  # noqa: E402
+
+
+def user_ids(n):
+    return [f"U{i:032x}" for i in range(n)]
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return kept, used
+
+
+def footprint(users):
+    now = time.time()
+    for label, make in (
+        ("dict", lambda u: {"user_id": u, "menu": None, "step": "check_in", "data": "ts",
+                            "lang": None, "last_seen": now, "saved": None}),
+        ("slots", lambda u: Session(u, step="check_in", data="ts", last_seen=now)),
+    ):
+        # user_id สร้างไว้ก่อน วัดเฉพาะ session
+        kept, used = measure(lambda: [make(u) for u in users])
+        print(f"{label:>6}: {used / len(users):6.0f} B/session  {used / 2**20:7.1f} MiB for {len(users)}")
+        del kept
+
+
+def traffic(args, users):
+    tmp = tempfile.TemporaryDirectory()
+    db = open_state(f"sqlite:{os.path.join(tmp.name, 'sessions.sqlite3')}") if args.state == "sqlite" else None
+    store = SessionStore(
+        maxsize=args.maxsize, idle_ttl=1800,
+        state=db if args.shared else None,
+        spill=None if args.shared else db,
+    )
+    rng = random.Random(1)
+    # 20% ของ user ส่งข้อความ 80%
+    hot = users[: max(1, len(users) // 5)]
+    picks = [rng.choice(hot) if rng.random() < 0.8 else rng.choice(users) for _ in range(args.events)]
+
+    start = time.perf_counter()
+    for i, user_id in enumerate(picks):
+        session = store.get(user_id)
+        if i % 7 == 0:
+            session.set_step("check_in", "ts")
+        elif i % 7 == 3:
+            session.clear_step()
+        store.save(session)
+    elapsed = time.perf_counter() - start
+    mode = args.state if args.state == "memory" else f"sqlite ({'shared' if args.shared else 'spill'})"
+    print(f"traffic [{mode}]: {args.events / elapsed:9.0f} events/s  {elapsed / args.events * 1e6:6.1f} us/event")
+    print(f"  stats: {store.stats()}")
+    tmp.cleanup()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=50000)
+    ap.add_argument("--events", type=int, default=200000)
+    ap.add_argument("--maxsize", type=int, default=50000)
+    ap.add_argument("--state", choices=("memory", "sqlite"), default="memory")
+    ap.add_argument("--shared", action="store_true", help="sqlite as multi-worker shared state (write-through)")
+    args = ap.parse_args()
+
+    users = user_ids(args.users)
+    footprint(users)
+    traffic(args, users)
+
+
+if __name__ == "__main__":
+    main()
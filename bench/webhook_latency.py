@@ -0,0 +1,45 @@
+# =====================
+# WEBHOOK LATENCY: inline vs queue
+#   python bench/webhook_latency.py --requests 400 --concurrency 20 --latency-ms 100
+# =====================
+import argparse
+import statistics
+
+from harness import app_server, fake_line_api, generate, percentile, replay, stop
+
+
+def run(mode, args, api_port):
+    proc, port = app_server(api_port, {
+        "WEBHOOK_MODE": mode,
+        "WEBHOOK_WORKERS": str(args.workers),
+    })
+    try:
+        requests = generate(args.requests, {"wifi": 1}, users=args.requests)
+        results, _ = replay(port, requests, rate=0, concurrency=args.concurrency)
+    finally:
+        stop(proc)
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    errors = sum(1 for r in results if r[1] != 200)
+    print(f"{mode:>6}: p50 {statistics.median(latencies):8.1f} ms  "
+          f"p99 {percentile(latencies, 0.99):8.1f} ms  errors {errors}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--concurrency", type=int, default=20)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--latency-ms", type=float, default=100)
+    args = ap.parse_args()
+
+    api, api_port = fake_line_api(args.latency_ms)
+    try:
+        for mode in ("inline", "queue"):
+            run(mode, args, api_port)
+    finally:
+        stop(api)
+
+
+if __name__ == "__main__":
+    main()
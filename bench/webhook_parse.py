@@ -0,0 +1,68 @@
+# =====================
+# WEBHOOK PARSE: WebhookParser (SDK) vs events.EventParser
+#   python bench/webhook_parse.py --events 1,10,100,500
+#
+# เวลาต่อ delivery = ตรวจ signature + decode body เป็น event ทั้งหมด
+# fast path วัดทั้ง orjson (ถ้าติดตั้ง) และ json ของ stdlib
+# =====================
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+warnings.filterwarnings("ignore")
+
+from linebot import WebhookParser  # noqa: E402
+
+import events  # noqa: E402
+from harness import INTENTS, SECRET, make_body, make_event  # noqa: E402
+
+
+def timed(fn, body, signature, budget):
+    fn(body, signature)
+    runs = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < budget:
+        fn(body, signature)
+        runs += 1
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", default="1,10,100,500", help="events per delivery")
+    ap.add_argument("--seconds", type=float, default=1.0, help="time budget per case")
+    args = ap.parse_args()
+
+    rng = random.Random(1)
+    sdk = WebhookParser(SECRET)
+    fast = events.EventParser(SECRET)
+    decoders = [("stdlib json", json.loads)]
+    if events.orjson is not None:
+        decoders.insert(0, ("orjson", events.orjson.loads))
+
+    for count in (int(n) for n in args.events.split(",")):
+        body, signature = make_body([make_event(rng.choice(list(INTENTS)), n, n % 100) for n in range(count)])
+        base = timed(lambda b, s: sdk.parse(b.decode("utf-8"), s), body, signature, args.seconds)
+        print(f"{count:4d} events ({len(body) / 1024:7.1f} KiB)")
+        print(f"    {'WebhookParser':>25}: {base * 1e6:9.1f} us/delivery")
+        for label, loads in decoders:
+            events.loads = loads
+            elapsed = timed(fast.parse, body, signature, args.seconds)
+            print(f"    {'EventParser + ' + label:>25}: {elapsed * 1e6:9.1f} us/delivery  {base / elapsed:5.1f}x")
+
+        # handler เห็นค่าเดียวกันทั้งสองแบบ
+        for a, b in zip(sdk.parse(body.decode("utf-8"), signature), fast.parse(body, signature)):
+            assert (a.type, a.reply_token, a.source.user_id, a.webhook_event_id) == \
+                   (b.type, b.reply_token, b.source.user_id, b.webhook_event_id)
+            assert (a.message.text if a.type == "message" else a.postback.data) == \
+                   (b.message.text if b.type == "message" else b.postback.data)
+
+
+if __name__ == "__main__":
+    main()
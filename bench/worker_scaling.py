@@ -0,0 +1,59 @@
+# =====================
+# WORKER SCALING: throughput ของ webhook mix เมื่อรัน 1..N uvicorn worker (SHARED_STATE=sqlite)
+#   python bench/worker_scaling.py --max-workers 4 --requests 2000
+# ใช้ rate 0 (ยิงเร็วที่สุด) -> วัดเพดาน req/s ต่อจำนวน worker
+# =====================
+import argparse
+import os
+import tempfile
+
+from harness import (
+    DEFAULT_MIX, app_server, fake_line_api, generate, parse_mix, replay, stop, summarize,
+)
+
+
+def run(workers, args, api_port, requests, state_dir):
+    proc, port = app_server(api_port, {
+        "WEBHOOK_MODE": args.mode,
+        "SHARED_STATE": f"sqlite:{os.path.join(state_dir, f'state-{workers}.sqlite3')}",
+    }, extra_args=("--workers", str(workers)))
+    try:
+        # รอบแรกให้ทุก worker โหลด catalog / เปิด connection ก่อนจับเวลา
+        replay(port, requests[:args.concurrency * 2], rate=0, concurrency=args.concurrency)
+        results, elapsed = replay(port, requests, rate=0, concurrency=args.concurrency)
+    finally:
+        stop(proc)
+    return summarize(requests, results, elapsed)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--mix", default=DEFAULT_MIX)
+    ap.add_argument("--mode", default="inline")
+    ap.add_argument("--latency-ms", type=float, default=20)
+    args = ap.parse_args()
+
+    requests = generate(args.requests, parse_mix(args.mix))
+    print(f"cpu count {os.cpu_count()}, {args.requests} requests, concurrency {args.concurrency}, "
+          f"fake LINE latency {args.latency_ms} ms")
+    api, api_port = fake_line_api(args.latency_ms)
+    baseline = None
+    try:
+        with tempfile.TemporaryDirectory() as state_dir:
+            for workers in range(1, args.max_workers + 1):
+                r = run(workers, args, api_port, requests, state_dir)
+                baseline = baseline or r["throughput_rps"]
+                errors = sum(n for status, n in r["status"].items() if status != "200")
+                print(f"{workers:>2} worker(s): {r['throughput_rps']:8.1f} req/s "
+                      f"(x{r['throughput_rps'] / baseline:4.2f})  "
+                      f"p50 {r['latency_ms']['p50']:7.1f} ms  p99 {r['latency_ms']['p99']:7.1f} ms  "
+                      f"errors {errors}")
+    finally:
+        stop(api)
+
+
+if __name__ == "__main__":
+    main()
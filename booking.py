@@ -0,0 +1,368 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+# =====================
+# BOOKING ENGINE
+# availability index: ห้องละ 1 int (bitset) bit i = คืนของวัน epoch + i ถูกจอง/hold อยู่
+# ถามว่าว่างไหมช่วง check_in..check_out = AND กับ mask 1 ครั้งต่อห้อง
+#
+# SQLite เก็บข้อมูลจริง index อยู่ใน memory ของแต่ละ process
+# กันจองซ้อน (หลาย thread / หลาย worker) ด้วย optimistic concurrency:
+#   อ่าน (bitset, version) ของห้องจาก index -> UPDATE room_versions ... WHERE version = ที่อ่านมา
+#   ไม่ตรง = มีคนเปลี่ยนห้องนี้ไปแล้ว -> โหลดห้องนั้นใหม่แล้วลองห้องถัดไป
+# =====================
+HOLD = "hold"
+CONFIRMED = "confirmed"
+SWEEP_INTERVAL = 5.0
+
+
+class Booking:
+    __slots__ = ("id", "room", "zone", "user_id", "check_in", "check_out", "status", "expires_at")
+
+    def __init__(self, id, room, zone, user_id, check_in, check_out, status, expires_at):
+        self.id = id
+        self.room = room
+        self.zone = zone
+        self.user_id = user_id
+        self.check_in = date.fromisoformat(check_in) if isinstance(check_in, str) else check_in
+        self.check_out = date.fromisoformat(check_out) if isinstance(check_out, str) else check_out
+        self.status = status
+        self.expires_at = expires_at
+
+    @property
+    def nights(self):
+        return (self.check_out - self.check_in).days
+
+    def active(self):
+        return self.status == CONFIRMED or (self.status == HOLD and self.expires_at > time.time())
+
+
+class BookingEngine:
+    def __init__(self, path, horizon=365, max_nights=30, hold_ttl=600, retries=8, today=date.today):
+        self.path = path
+        self.horizon = horizon
+        self.max_nights = max_nights
+        self.hold_ttl = hold_ttl
+        self.retries = retries
+        self.today = today
+        self.lock = threading.Lock()
+        self.db_lock = threading.Lock()
+        self.pid = None
+        self.rooms = {}
+        self.zone_of = {}
+        self.bits = {}
+        self.versions = {}
+        self.epoch = None
+        self.data_version = None
+        self.swept_at = 0.0
+        self.conflicts = 0
+        self.holds = 0
+        self.full = 0
+
+    # ---------- SQLite ----------
+    # connection ต่อ process (fork แล้วต้องเปิดใหม่) ใช้ร่วมกันทุก thread ผ่าน db_lock
+    def _db(self):
+        if self.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(
+                "CREATE TABLE IF NOT EXISTS bookings ("
+                " id INTEGER PRIMARY KEY, room TEXT, zone TEXT, user_id TEXT,"
+                " check_in TEXT, check_out TEXT, status TEXT, expires_at REAL, created_at REAL);"
+                "CREATE INDEX IF NOT EXISTS bookings_room ON bookings (room, status, check_out);"
+                "CREATE INDEX IF NOT EXISTS bookings_hold ON bookings (status, expires_at);"
+                "CREATE TABLE IF NOT EXISTS room_versions (room TEXT PRIMARY KEY, version INTEGER);"
+            )
+            self.conn = db
+            self.pid = os.getpid()
+            self.epoch = None
+        return self.conn
+
+    # ห้องจาก catalog ({zone: (room, ...)}) เปลี่ยนเมื่อ reload catalog
+    def use_rooms(self, rooms):
+        with self.lock:
+            if rooms == self.rooms and self.pid == os.getpid():
+                return
+            self.rooms = {zone: tuple(r) for zone, r in rooms.items()}
+            self.zone_of = {room: zone for zone, r in self.rooms.items() for room in r}
+            with self.db_lock:
+                self._db().executemany(
+                    "INSERT OR IGNORE INTO room_versions VALUES (?, 0)", [(r,) for r in self.zone_of]
+                )
+            self._load()
+
+    # ---------- index ----------
+    def _mask(self, check_in, check_out):
+        offset = (check_in - self.epoch).days
+        return ((1 << (check_out - check_in).days) - 1) << offset
+
+    def _room_state(self, room, now):
+        rows = self.conn.execute(
+            "SELECT check_in, check_out FROM bookings WHERE room = ? AND check_out > ?"
+            " AND (status = ? OR (status = ? AND expires_at > ?))",
+            (room, self.epoch.isoformat(), CONFIRMED, HOLD, now),
+        ).fetchall()
+        bits = 0
+        end = self.epoch + timedelta(days=self.horizon)
+        for check_in, check_out in rows:
+            start = max(date.fromisoformat(check_in), self.epoch)
+            stop = min(date.fromisoformat(check_out), end)
+            if start < stop:
+                bits |= self._mask(start, stop)
+        version = self.conn.execute(
+            "SELECT version FROM room_versions WHERE room = ?", (room,)
+        ).fetchone()
+        return bits, version[0] if version else 0
+
+    def _reload_room(self, room):
+        with self.db_lock:
+            self.bits[room], self.versions[room] = self._room_state(room, time.time())
+
+    def _load(self):
+        now = time.time()
+        self.epoch = self.today()
+        self.bits = {}
+        self.versions = {}
+        with self.db_lock:
+            db = self._db()
+            for room in self.zone_of:
+                self.bits[room], self.versions[room] = self._room_state(room, now)
+            self.data_version = db.execute("PRAGMA data_version").fetchone()[0]
+
+    # เรียกก่อนทุก operation (ถือ self.lock อยู่)
+    def _refresh(self):
+        today = self.today()
+        if self.epoch is None or self.pid != os.getpid():
+            self._load()
+            return
+        if today > self.epoch:
+            # เลื่อนหน้าต่าง 365 วัน คืนที่ผ่านไปแล้วหลุดออกด้านล่าง
+            shift = (today - self.epoch).days
+            self.bits = {room: bits >> shift for room, bits in self.bits.items()}
+            self.epoch = today
+        with self.db_lock:
+            # data_version เปลี่ยน = connection อื่น (worker อื่น) commit -> โหลด index ใหม่
+            changed = self.conn.execute("PRAGMA data_version").fetchone()[0] != self.data_version
+        if changed:
+            self._load()
+        now = time.time()
+        if now - self.swept_at >= SWEEP_INTERVAL:
+            self.swept_at = now
+            self._expire_holds(now)
+
+    def _expire_holds(self, now):
+        with self.db_lock:
+            db = self.conn
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rooms = [r for (r,) in db.execute(
+                    "SELECT DISTINCT room FROM bookings WHERE status = ? AND expires_at <= ?", (HOLD, now)
+                )]
+                if rooms:
+                    db.execute(
+                        "UPDATE bookings SET status = 'expired' WHERE status = ? AND expires_at <= ?",
+                        (HOLD, now),
+                    )
+                    db.executemany(
+                        "UPDATE room_versions SET version = version + 1 WHERE room = ?", [(r,) for r in rooms]
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        for room in rooms:
+            if room in self.zone_of:
+                self._reload_room(room)
+
+    def valid_range(self, check_in, check_out):
+        today = self.today()
+        nights = (check_out - check_in).days
+        return (
+            today <= check_in
+            and 0 < nights <= self.max_nights
+            and check_out <= today + timedelta(days=self.horizon)
+        )
+
+    # ---------- queries ----------
+    def available(self, zone, check_in, check_out):
+        with self.lock:
+            self._refresh()
+            mask = self._mask(check_in, check_out)
+            return [room for room in self.rooms.get(zone, ()) if not self.bits[room] & mask]
+
+    # {zone: จำนวนห้องว่าง} ทุกโซนในช่วงวันที่เลือก
+    def availability(self, check_in, check_out):
+        with self.lock:
+            self._refresh()
+            mask = self._mask(check_in, check_out)
+            return {
+                zone: sum(1 for room in rooms if not self.bits[room] & mask)
+                for zone, rooms in self.rooms.items()
+            }
+
+    # ---------- holds ----------
+    # 1 user มี hold ค้างได้ 1 รายการ: เลือกวันใหม่ = ปล่อย hold เดิมก่อน
+    # กันคนเดียวกดซ้ำจน hold ทุกห้องในโซนไว้จนหมด BOOKING_HOLD_TTL
+    def hold(self, zone, check_in, check_out, user_id):
+        self._release_holds(user_id)
+        for _ in range(self.retries):
+            with self.lock:
+                self._refresh()
+                mask = self._mask(check_in, check_out)
+                free = [(room, self.versions[room]) for room in self.rooms.get(zone, ())
+                        if not self.bits[room] & mask]
+            if not free:
+                self.full += 1
+                return None
+            # สุ่มห้อง ลดโอกาสที่คนจองพร้อมกันจะชนห้องเดียวกัน
+            room, version = random.choice(free)
+            booking, released = self._commit_hold(room, version, zone, check_in, check_out, user_id)
+            if booking is not None:
+                with self.lock:
+                    if self.versions.get(room) == version:
+                        self.bits[room] |= mask
+                        self.versions[room] = version + 1
+                    # hold อื่นของ user ที่เกิดพร้อมกัน (อีก thread / worker) ถูกยกเลิกใน transaction เดียวกัน
+                    for other in released:
+                        if other in self.zone_of:
+                            self._reload_room(other)
+                self.holds += 1
+                return booking
+            self.conflicts += 1
+            with self.lock:
+                self._reload_room(room)
+        return None
+
+    def _commit_hold(self, room, version, zone, check_in, check_out, user_id):
+        now = time.time()
+        expires_at = now + self.hold_ttl
+        with self.db_lock:
+            db = self.conn
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = db.execute(
+                    "UPDATE room_versions SET version = version + 1 WHERE room = ? AND version = ?",
+                    (room, version),
+                )
+                if cur.rowcount != 1:
+                    db.execute("ROLLBACK")
+                    return None, ()
+                released = self._cancel_holds(db, user_id)
+                cur = db.execute(
+                    "INSERT INTO bookings (room, zone, user_id, check_in, check_out, status, expires_at, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (room, zone, user_id, check_in.isoformat(), check_out.isoformat(), HOLD, expires_at, now),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return Booking(cur.lastrowid, room, zone, user_id, check_in, check_out, HOLD, expires_at), released
+
+    # ยกเลิก hold ที่ยังไม่หมดเวลาทั้งหมดของ user (เรียกใน transaction) -> ห้องที่ถูกปล่อย
+    def _cancel_holds(self, db, user_id):
+        now = time.time()
+        rooms = [r for (r,) in db.execute(
+            "SELECT DISTINCT room FROM bookings WHERE user_id = ? AND status = ? AND expires_at > ?",
+            (user_id, HOLD, now),
+        )]
+        if rooms:
+            db.execute(
+                "UPDATE bookings SET status = 'cancelled' WHERE user_id = ? AND status = ? AND expires_at > ?",
+                (user_id, HOLD, now),
+            )
+            db.executemany(
+                "UPDATE room_versions SET version = version + 1 WHERE room = ?", [(r,) for r in rooms]
+            )
+        return rooms
+
+    def _release_holds(self, user_id):
+        with self.db_lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rooms = self._cancel_holds(db, user_id)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        with self.lock:
+            # index ยังไม่โหลด -> _refresh ครั้งแรกโหลดทั้งหมดเองอยู่แล้ว
+            if self.epoch is None:
+                return
+            for room in rooms:
+                if room in self.zone_of:
+                    self._reload_room(room)
+
+    # hold -> confirmed (เฉพาะเจ้าของและยังไม่หมดเวลา) ห้องไม่เปลี่ยนจึงไม่ต้องเพิ่ม version
+    def confirm(self, booking_id, user_id):
+        with self.db_lock:
+            db = self._db()
+            cur = db.execute(
+                "UPDATE bookings SET status = ?, expires_at = NULL"
+                " WHERE id = ? AND user_id = ? AND status = ? AND expires_at > ?",
+                (CONFIRMED, booking_id, user_id, HOLD, time.time()),
+            )
+            if cur.rowcount != 1:
+                return None
+            row = db.execute(
+                "SELECT id, room, zone, user_id, check_in, check_out, status, expires_at"
+                " FROM bookings WHERE id = ?", (booking_id,)
+            ).fetchone()
+        return Booking(*row)
+
+    # ยกเลิก hold ของตัวเอง -> คืนห้องเข้า index ทันที
+    def cancel(self, booking_id, user_id):
+        with self.db_lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT room FROM bookings WHERE id = ? AND user_id = ? AND status = ?",
+                    (booking_id, user_id, HOLD),
+                ).fetchone()
+                if row is not None:
+                    db.execute("UPDATE bookings SET status = 'cancelled' WHERE id = ?", (booking_id,))
+                    db.execute("UPDATE room_versions SET version = version + 1 WHERE room = ?", row)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return False
+        if row[0] in self.zone_of:
+            with self.lock:
+                self._reload_room(row[0])
+        return True
+
+    def get(self, booking_id):
+        with self.db_lock:
+            row = self._db().execute(
+                "SELECT id, room, zone, user_id, check_in, check_out, status, expires_at"
+                " FROM bookings WHERE id = ?", (booking_id,)
+            ).fetchone()
+        return None if row is None else Booking(*row)
+
+    # ห้องที่แขกพักอยู่วันนี้ (booking ที่ยืนยันแล้ว) ไม่มี -> None
+    def current_room(self, user_id):
+        today = self.today().isoformat()
+        with self.db_lock:
+            row = self._db().execute(
+                "SELECT room FROM bookings WHERE user_id = ? AND status = ? AND check_in <= ? AND check_out > ?"
+                " ORDER BY check_in DESC LIMIT 1",
+                (user_id, CONFIRMED, today, today),
+            ).fetchone()
+        return row[0] if row else None
+
+    def stats(self):
+        return {
+            "rooms": len(self.zone_of),
+            "holds": self.holds,
+            "full": self.full,
+            "conflicts": self.conflicts,
+        }
@@ -0,0 +1,281 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# =====================
+# BROADCAST
+# ส่งโปรโมชัน (reply ใน catalog.json เช่น coffee_promo) ให้ทุกคนที่ follow OA ผ่าน multicast
+#
+#   python broadcast.py sync-followers            -> ดึงรายชื่อ follower จาก LINE (บัญชี verified/premium)
+#   python broadcast.py send --job promo-1026 --reply coffee_promo
+#   python broadcast.py send --job promo-1026     -> รันซ้ำด้วย job เดิม = ทำต่อจากที่ค้าง
+#   python broadcast.py status --job promo-1026
+#
+# followers ถูกบันทึกจาก follow / unfollow event ใน app.py (followers.py)
+# job: อ่าน follower ทีละ chunk (keyset ตาม user_id) -> batch ละ <= 500 คน
+#   batch ถูกบันทึก (รายชื่อ + retry key) ก่อนส่ง = checkpoint
+#   ส่งด้วย X-Line-Retry-Key ของ batch: ตายกลางทางแล้วส่งซ้ำ LINE ตอบ 409 ไม่ส่งซ้ำให้ผู้รับ
+#   ข้อความถูก copy ลง job ตอนสร้าง แก้ catalog ระหว่าง resume ไม่กระทบ
+# =====================
+MAX_RECIPIENTS = 500
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+
+# จำกัดจำนวน request ต่อวินาทีรวมทุก thread (เว้นระยะเท่าๆ กัน)
+class RateLimit:
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            at = max(self.next_at, now)
+            self.next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+# =====================
+# JOB RUNNER
+# send(recipients, messages, retry_key) -> request id, error จาก LINE = LineBotApiError
+# =====================
+class Broadcast:
+    def __init__(self, followers, send, batch_size=MAX_RECIPIENTS, concurrency=4, rate=50.0):
+        self.followers = followers
+        self.send = send
+        self.batch_size = min(batch_size, MAX_RECIPIENTS)
+        self.concurrency = concurrency
+        self.rate = RateLimit(rate)
+        self.lock = threading.Lock()
+        self.totals = {SENT: 0, FAILED: 0, "recipients": 0}
+        # job / batch อยู่ในไฟล์เดียวกับ followers (connection ต่อ thread ของ Followers)
+        self._db().executescript(
+            "CREATE TABLE IF NOT EXISTS broadcast_jobs ("
+            " id TEXT PRIMARY KEY, reply TEXT, messages TEXT, checkpoint TEXT, planned INTEGER,"
+            " created_at REAL, finished_at REAL);"
+            "CREATE TABLE IF NOT EXISTS broadcast_batches ("
+            " job TEXT, seq INTEGER, recipients TEXT, count INTEGER, retry_key TEXT, status TEXT,"
+            " attempts INTEGER, http_status INTEGER, request_id TEXT, error TEXT, seconds REAL,"
+            " sent_at REAL, PRIMARY KEY (job, seq));"
+        )
+
+    def _db(self):
+        return self.followers._db()
+
+    def job(self, job_id):
+        row = self._db().execute(
+            "SELECT id, reply, messages, checkpoint, planned, created_at, finished_at FROM broadcast_jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "reply", "messages", "checkpoint", "planned", "created_at", "finished_at")
+        job = dict(zip(keys, row))
+        job["messages"] = [m.encode() for m in json.loads(job["messages"])]
+        return job
+
+    def create(self, job_id, reply, messages):
+        self._db().execute(
+            "INSERT INTO broadcast_jobs VALUES (?, ?, ?, '', 0, ?, NULL)",
+            (job_id, reply, json.dumps([m.decode() for m in messages], ensure_ascii=False), time.time()),
+        )
+        return self.job(job_id)
+
+    def run(self, job, progress=None):
+        db = self._db()
+        started = time.perf_counter()
+        # จำกัด batch ที่รอส่งในคิว -> memory คงที่ไม่ว่าจะมี follower กี่คน
+        slots = threading.BoundedSemaphore(self.concurrency * 2)
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="broadcast") as pool:
+            def submit(seq, recipients, retry_key):
+                slots.acquire()
+                future = pool.submit(self._send_batch, job, seq, recipients, retry_key)
+                future.add_done_callback(lambda _: slots.release())
+
+            # 1) batch ที่บันทึกไว้แล้วแต่ยังส่งไม่สำเร็จ (resume)
+            for seq, recipients, retry_key in db.execute(
+                "SELECT seq, recipients, retry_key FROM broadcast_batches"
+                " WHERE job = ? AND status != ? AND (http_status IS NULL OR http_status = 429 OR http_status >= 500)"
+                " ORDER BY seq",
+                (job["id"], SENT),
+            ).fetchall():
+                submit(seq, recipients.split(","), retry_key)
+
+            # 2) follower ที่ยังไม่ถึง: checkpoint = user_id สุดท้ายที่ทำ batch แล้ว
+            if not job["planned"]:
+                seq = db.execute(
+                    "SELECT COALESCE(MAX(seq), -1) + 1 FROM broadcast_batches WHERE job = ?", (job["id"],)
+                ).fetchone()[0]
+                for recipients in self.followers.stream(job["checkpoint"], self.batch_size):
+                    retry_key = str(uuid.uuid4())
+                    db.execute("BEGIN")
+                    db.execute(
+                        "INSERT INTO broadcast_batches (job, seq, recipients, count, retry_key, status, attempts)"
+                        " VALUES (?, ?, ?, ?, ?, ?, 0)",
+                        (job["id"], seq, ",".join(recipients), len(recipients), retry_key, PENDING),
+                    )
+                    db.execute("UPDATE broadcast_jobs SET checkpoint = ? WHERE id = ?", (recipients[-1], job["id"]))
+                    db.execute("COMMIT")
+                    submit(seq, recipients, retry_key)
+                    seq += 1
+                    if progress is not None:
+                        progress(self.totals)
+                db.execute("UPDATE broadcast_jobs SET planned = 1 WHERE id = ?", (job["id"],))
+
+        if not self.summary(job["id"])["batches"][PENDING]:
+            db.execute("UPDATE broadcast_jobs SET finished_at = ? WHERE id = ?", (time.time(), job["id"]))
+        return {**self.totals, "seconds": round(time.perf_counter() - started, 3)}
+
+    def _send_batch(self, job, seq, recipients, retry_key):
+        self.rate.wait()
+        started = time.perf_counter()
+        status, http_status, request_id, error = SENT, 200, None, None
+        try:
+            request_id = self.send(recipients, job["messages"], retry_key)
+        except Exception as e:
+            http_status = getattr(e, "status_code", None)
+            if http_status == 409:
+                # retry key นี้ LINE รับไปแล้ว (ส่งสำเร็จก่อน crash)
+                status, request_id = SENT, getattr(e, "accepted_request_id", None)
+            else:
+                status, error = FAILED, str(getattr(e, "error", None) or e)[:500]
+                logger.warning("broadcast %s batch %d failed: %s", job["id"], seq, error)
+        self._db().execute(
+            "UPDATE broadcast_batches SET status = ?, attempts = attempts + 1, http_status = ?, request_id = ?,"
+            " error = ?, seconds = ?, sent_at = ? WHERE job = ? AND seq = ?",
+            (status, http_status, request_id, error, round(time.perf_counter() - started, 4), time.time(),
+             job["id"], seq),
+        )
+        with self.lock:
+            self.totals[status] += 1
+            if status == SENT:
+                self.totals["recipients"] += len(recipients)
+
+    def summary(self, job_id):
+        rows = self._db().execute(
+            "SELECT status, COUNT(*), COALESCE(SUM(count), 0) FROM broadcast_batches WHERE job = ? GROUP BY status",
+            (job_id,),
+        ).fetchall()
+        by_status = {status: (batches, recipients) for status, batches, recipients in rows}
+        return {
+            "batches": {s: by_status.get(s, (0, 0))[0] for s in (SENT, FAILED, PENDING)},
+            "recipients": {s: by_status.get(s, (0, 0))[1] for s in (SENT, FAILED, PENDING)},
+        }
+
+    def failures(self, job_id, limit=10):
+        return self._db().execute(
+            "SELECT seq, count, http_status, error FROM broadcast_batches"
+            " WHERE job = ? AND status = ? ORDER BY seq LIMIT ?",
+            (job_id, FAILED, limit),
+        ).fetchall()
+
+
+# =====================
+# CLI
+# =====================
+def _app():
+    # ใช้ catalog / LINE client / env ชุดเดียวกับ app (LINE_API_ENDPOINT ชี้ไป fake API ได้)
+    import app
+
+    return app
+
+
+def cmd_sync(args):
+    app = _app()
+    added, start = 0, None
+    while True:
+        page = app.line_bot_api.get_followers_ids(limit=1000, start=start)
+        for user_id in page.user_ids:
+            app.followers.follow(user_id)
+        added += len(page.user_ids)
+        start = page.next
+        if not start:
+            break
+    print(f"synced {added} followers ({app.followers.count()} following)")
+
+
+def cmd_send(args):
+    app = _app()
+    from planner import MAX_MESSAGES
+    from transport import multicast_raw
+
+    broadcast = Broadcast(
+        app.followers,
+        send=lambda to, messages, retry_key: multicast_raw(app.line_bot_api, to, messages, retry_key),
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        rate=args.rate,
+    )
+    job = broadcast.job(args.job)
+    if job is None:
+        if not args.reply:
+            sys.exit(f"job {args.job!r} does not exist: give --reply <name> to create it")
+        replies = app.catalog.get().replies
+        if args.reply not in replies:
+            sys.exit(f"unknown reply {args.reply!r} (replies: {', '.join(sorted(replies))})")
+        if len(replies[args.reply]) > MAX_MESSAGES:
+            sys.exit(f"reply {args.reply!r} has more than {MAX_MESSAGES} messages (multicast limit)")
+        job = broadcast.create(args.job, args.reply, list(replies[args.reply]))
+        print(f"job {args.job}: {args.reply} -> {app.followers.count()} followers")
+    else:
+        if args.reply and args.reply != job["reply"]:
+            sys.exit(f"job {args.job!r} already sends {job['reply']!r}")
+        print(f"job {args.job}: resuming after {job['checkpoint'] or 'start'}")
+
+    def progress(totals):
+        done = totals[SENT] + totals[FAILED]
+        if done and done % args.progress_every == 0:
+            print(f"  {totals[SENT]} batches sent, {totals[FAILED]} failed, {totals['recipients']} recipients")
+
+    result = broadcast.run(job, progress=progress)
+    print(json.dumps({"run": result, "job": broadcast.summary(args.job)}, ensure_ascii=False))
+    for seq, count, http_status, error in broadcast.failures(args.job):
+        print(f"  batch {seq} ({count}) failed: {http_status} {error}")
+
+
+def cmd_status(args):
+    app = _app()
+    broadcast = Broadcast(app.followers, send=None)
+    job = broadcast.job(args.job)
+    if job is None:
+        sys.exit(f"job {args.job!r} does not exist")
+    del job["messages"]
+    print(json.dumps({**job, **broadcast.summary(args.job)}, ensure_ascii=False))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync-followers")
+    send = sub.add_parser("send")
+    send.add_argument("--job", required=True)
+    send.add_argument("--reply", help="reply name in catalog.json (needed when creating the job)")
+    send.add_argument("--batch-size", type=int, default=MAX_RECIPIENTS)
+    send.add_argument("--concurrency", type=int, default=4)
+    send.add_argument("--rate", type=float, default=float(os.getenv("BROADCAST_RATE", "50")),
+                      help="multicast requests per second")
+    send.add_argument("--progress-every", type=int, default=20)
+    status = sub.add_parser("status")
+    status.add_argument("--job", required=True)
+    args = ap.parse_args()
+    {"sync-followers": cmd_sync, "send": cmd_send, "status": cmd_status}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
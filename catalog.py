@@ -0,0 +1,501 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+
+from linebot.models import (
+    FlexSendMessage,
+    ImageSendMessage,
+    MessageAction,
+    QuickReply,
+    QuickReplyButton,
+    TextSendMessage,
+)
+
+from intents import IntentRegistry, normalize
+from replies import serialize
+
+logger = logging.getLogger(__name__)
+
+# ข้อความที่โค้ดใช้เป็น template -> placeholder ที่ต้องมีให้ format ได้
+REQUIRED_TEXTS = {
+    "room_detail": {"name": "", "price": 0, "amenities": "", "resort_amenities": ""},
+    "room_card_title": {"name": ""},
+    "room_card_price": {"price": 0},
+    "room_cards_alt": {},
+    "booking_pick_check_in": {"name": "", "price": 0},
+    "booking_pick_check_out": {"check_in": "", "max_nights": 0},
+    "booking_check_in_button": {},
+    "booking_check_out_button": {},
+    "booking_held": {"name": "", "room": "", "check_in": "", "check_out": "", "nights": 0, "total": 0, "minutes": 0},
+    "booking_confirm_button": {},
+    "booking_cancel_button": {},
+    "booking_confirmed": {"id": 0, "name": "", "room": "", "check_in": "", "check_out": "", "nights": 0, "total": 0},
+    "booking_full": {"name": "", "check_in": "", "check_out": ""},
+    "booking_alternatives": {"zones": ""},
+    "booking_cancelled": {},
+    "booking_expired": {},
+    "booking_invalid_dates": {"max_nights": 0, "horizon": 0},
+    "housekeeping_received": {"id": 0, "minutes": 0},
+    "housekeeping_duplicate": {"id": 0, "status": ""},
+    "housekeeping_status": {"id": 0, "day": "", "status": ""},
+    "housekeeping_none": {},
+    "housekeeping_pending": {},
+    "housekeeping_notified": {},
+    "housekeeping_done": {},
+    "housekeeping_batch": {"count": 0, "items": ""},
+    "housekeeping_batch_item": {"id": 0, "room": "", "name": "", "time": ""},
+    "contact_received": {},
+    "contact_greeting": {"nickname": ""},
+}
+
+# ข้อจำกัดของ LINE
+MAX_QUICK_REPLY = 13
+MAX_CAROUSEL = 12
+
+
+class CatalogError(ValueError):
+    def __init__(self, errors):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+def _bullets(items):
+    return "".join(f"- {item}\n" for item in items)
+
+
+# room_detail_<zone> สร้างจาก zones อัตโนมัติ ไม่ต้องเขียนใน intents เอง
+def _intent_specs(data):
+    specs = dict(data.get("intents") or {})
+    for zone in data.get("zones") or ():
+        if isinstance(zone, dict) and isinstance(zone.get("id"), str):
+            name = f"room_detail_{zone['id']}"
+            specs.setdefault(name, {"postback": [name], "reply": name})
+    return specs
+
+
+# =====================
+# VALIDATE
+# เก็บ error ทั้งหมดแล้วแจ้งทีเดียว ไม่หยุดที่ตัวแรก
+# =====================
+def validate(data, handlers, media):
+    errors = []
+
+    def check(ok, where, message):
+        if not ok:
+            errors.append(f"{where}: {message}")
+        return ok
+
+    def strings(value, where):
+        if check(isinstance(value, list) and value, where, "must be a non-empty list"):
+            for i, item in enumerate(value):
+                check(isinstance(item, str) and item.strip(), f"{where}[{i}]", "must be a non-empty string")
+
+    def image(name, where):
+        if check(isinstance(name, str), where, "must be an image file name"):
+            check(media(name) is not None, where, f"image {name!r} not found in static/images")
+
+    if not check(isinstance(data, dict), "catalog", "must be an object"):
+        raise CatalogError(errors)
+
+    texts = data.get("texts")
+    if check(isinstance(texts, dict), "texts", "must be an object"):
+        for name, fields in REQUIRED_TEXTS.items():
+            value = texts.get(name)
+            if check(isinstance(value, str), f"texts.{name}", "missing"):
+                try:
+                    value.format(**fields)
+                except (KeyError, IndexError, ValueError) as e:
+                    check(False, f"texts.{name}", f"bad placeholder {e}")
+
+    strings(data.get("resort_amenities"), "resort_amenities")
+
+    zones = data.get("zones")
+    generated = {"room_cards"}
+    rooms = {}
+    if check(isinstance(zones, list) and 0 < len(zones) <= MAX_CAROUSEL,
+             "zones", f"must be a list of 1-{MAX_CAROUSEL} zones"):
+        for i, zone in enumerate(zones):
+            where = f"zones[{i}]"
+            if not check(isinstance(zone, dict), where, "must be an object"):
+                continue
+            zone_id = zone.get("id")
+            if check(isinstance(zone_id, str) and zone_id.isidentifier(), f"{where}.id", "must be an identifier"):
+                check(f"room_detail_{zone_id}" not in generated, f"{where}.id", f"duplicate zone {zone_id!r}")
+                generated.add(f"room_detail_{zone_id}")
+            check(isinstance(zone.get("name"), str) and zone["name"], f"{where}.name", "must be a non-empty string")
+            price = zone.get("price")
+            check(type(price) is int and price > 0, f"{where}.price", "must be a positive integer")
+            image(zone.get("hero"), f"{where}.hero")
+            if check(isinstance(zone.get("images"), list) and zone["images"], f"{where}.images", "must be a non-empty list"):
+                for j, name in enumerate(zone["images"]):
+                    image(name, f"{where}.images[{j}]")
+            strings(zone.get("amenities"), f"{where}.amenities")
+            # ห้องจริงของโซน (ไม่มี = จองผ่านแอดมินอย่างเดียว)
+            if "rooms" in zone:
+                strings(zone["rooms"], f"{where}.rooms")
+                for room in zone["rooms"] if isinstance(zone["rooms"], list) else ():
+                    if isinstance(room, str):
+                        owner = rooms.setdefault(room, where)
+                        check(owner == where, f"{where}.rooms", f"room {room!r} already in {owner}")
+
+    quick_replies = data.get("quick_replies", {})
+    if check(isinstance(quick_replies, dict), "quick_replies", "must be an object"):
+        for name, buttons in quick_replies.items():
+            where = f"quick_replies.{name}"
+            if not check(isinstance(buttons, list) and 0 < len(buttons) <= MAX_QUICK_REPLY,
+                         where, f"must be a list of 1-{MAX_QUICK_REPLY} buttons"):
+                continue
+            for i, button in enumerate(buttons):
+                ok = isinstance(button, dict) and all(
+                    isinstance(button.get(k), str) and button[k] for k in ("label", "text")
+                )
+                check(ok, f"{where}[{i}]", "needs label and text")
+    else:
+        quick_replies = {}
+
+    replies = data.get("replies")
+    if check(isinstance(replies, dict), "replies", "must be an object"):
+        for name, specs in replies.items():
+            where = f"replies.{name}"
+            check(name not in generated, where, "name is generated from zones")
+            if not check(isinstance(specs, list) and specs, where, "must be a non-empty list"):
+                continue
+            for i, spec in enumerate(specs):
+                at = f"{where}[{i}]"
+                if not check(isinstance(spec, dict) and len({"text", "image"} & spec.keys()) == 1,
+                             at, "needs exactly one of text / image"):
+                    continue
+                if "image" in spec:
+                    image(spec["image"], f"{at}.image")
+                else:
+                    check(isinstance(spec["text"], str) and spec["text"], f"{at}.text", "must be a non-empty string")
+                    if "quick_reply" in spec:
+                        check(spec["quick_reply"] in quick_replies, f"{at}.quick_reply",
+                              f"unknown quick reply {spec['quick_reply']!r}")
+        generated |= replies.keys()
+
+    intents = data.get("intents")
+    if check(isinstance(intents, dict), "intents", "must be an object"):
+        seen = {"text": {}, "postback": {}}
+        for name, spec in _intent_specs(data).items():
+            where = f"intents.{name}"
+            if not check(isinstance(spec, dict), where, "must be an object"):
+                continue
+            if check(("reply" in spec) != ("handler" in spec), where, "needs exactly one of reply / handler"):
+                if "reply" in spec:
+                    check(spec["reply"] in generated, f"{where}.reply", f"unknown reply {spec['reply']!r}")
+                else:
+                    check(spec["handler"] in handlers, f"{where}.handler", f"unknown handler {spec['handler']!r}")
+            for kind in ("text", "postback"):
+                if kind not in spec:
+                    continue
+                strings(spec[kind], f"{where}.{kind}")
+                for alias in spec[kind] if isinstance(spec[kind], list) else ():
+                    if not isinstance(alias, str):
+                        continue
+                    owner = seen[kind].setdefault(normalize(alias), name)
+                    check(owner == name, f"{where}.{kind}", f"alias {alias!r} already used by {owner}")
+
+    if errors:
+        raise CatalogError(errors)
+
+
+# =====================
+# COMPILE
+# catalog -> LINE message objects -> JSON bytes พร้อมส่ง (ทำครั้งเดียวตอนโหลด)
+# =====================
+def build_messages(data, media):
+    texts = data["texts"]
+    quick = {
+        name: QuickReply(items=[
+            QuickReplyButton(action=MessageAction(label=b["label"], text=b["text"])) for b in buttons
+        ])
+        for name, buttons in data.get("quick_replies", {}).items()
+    }
+
+    def image(name):
+        original, preview = media(name)
+        return ImageSendMessage(original_content_url=original, preview_image_url=preview)
+
+    def message(spec):
+        if "image" in spec:
+            return image(spec["image"])
+        return TextSendMessage(text=spec["text"], quick_reply=quick.get(spec.get("quick_reply")))
+
+    messages = {name: [message(s) for s in specs] for name, specs in data["replies"].items()}
+
+    resort_amenities = _bullets(data["resort_amenities"])
+    cards = []
+    for zone in data["zones"]:
+        detail = f"room_detail_{zone['id']}"
+        text = texts["room_detail"].format(
+            name=zone["name"],
+            price=zone["price"],
+            amenities=_bullets(zone["amenities"]),
+            resort_amenities=resort_amenities,
+        )
+        messages[detail] = [TextSendMessage(text=text)] + [image(n) for n in zone["images"]]
+        cards.append(room_card(
+            title=texts["room_card_title"].format(name=zone["name"]),
+            price=texts["room_card_price"].format(price=zone["price"]),
+            image_url=media(zone["hero"])[0],
+            detail_data=detail,
+            book_data=f"book_room:{zone['id']}",
+        ))
+
+    messages["room_cards"] = [
+        FlexSendMessage(
+            alt_text=texts["room_cards_alt"],
+            contents={"type": "carousel", "contents": cards}
+        )
+    ]
+    return messages
+
+
+def room_card(title, price, image_url, detail_data, book_data):
+    return {
+        "type": "bubble",
+        "hero": {
+            "type": "image",
+            "url": image_url,
+            "size": "full",
+            "aspectRatio": "20:13",
+            "aspectMode": "cover"
+        },
+        "body": {
+            "type": "box",
+            "layout": "vertical",
+            "contents": [
+                {"type": "text", "text": title, "weight": "bold", "size": "lg"},
+                {"type": "text", "text": price, "color": "#666666"}
+            ]
+        },
+        "footer": {
+            "type": "box",
+            "layout": "horizontal",
+            "contents": [
+                {
+                    "type": "button",
+                    "action": {
+                        "type": "postback",
+                        "label": "ข้อมูลเพิ่มเติม",
+                        "data": detail_data
+                    }
+                },
+                {
+                    "type": "button",
+                    "style": "primary",
+                    "action": {
+                        "type": "postback",
+                        "label": "จองห้องพัก",
+                        "data": book_data
+                    }
+                }
+            ]
+        }
+    }
+
+
+class Intent:
+    __slots__ = ("name", "handler", "reply")
+
+    def __init__(self, name, handler=None, reply=None):
+        self.name = name
+        self.handler = handler
+        self.reply = reply
+
+
+# catalog ที่ compile แล้ว 1 เวอร์ชัน (ไม่แก้หลังสร้าง -> ใช้ข้าม thread ได้)
+class Content:
+    def __init__(self, data, replies, text_intents, postback_intents, version):
+        self.data = data
+        self.texts = data["texts"]
+        self.replies = replies
+        self.text_intents = text_intents
+        self.postback_intents = postback_intents
+        self.version = version
+        self.from_snapshot = False
+        self.zones = {zone["id"]: zone for zone in data["zones"]}
+        self.rooms = {zone["id"]: tuple(zone["rooms"]) for zone in data["zones"] if zone.get("rooms")}
+
+
+# replies มาจาก snapshot = compile + validate ไปแล้วตอนสร้าง snapshot
+def compile_catalog(data, handlers, media, version=None, replies=None):
+    if replies is None:
+        validate(data, handlers, media)
+        replies = {
+            name: tuple(serialize(m) for m in messages)
+            for name, messages in build_messages(data, media).items()
+        }
+    text_intents = IntentRegistry()
+    postback_intents = IntentRegistry(fuzzy=False)
+    for name, spec in _intent_specs(data).items():
+        intent = Intent(name, handlers.get(spec.get("handler")), spec.get("reply"))
+        for alias in spec.get("text", ()):
+            text_intents.add(alias, intent)
+        for alias in spec.get("postback", ()):
+            postback_intents.add(alias, intent)
+    return Content(data, replies, text_intents, postback_intents, version)
+
+
+def read(path):
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise CatalogError([f"{path}: YAML catalog needs `pip install pyyaml`"])
+            data = yaml.safe_load(raw)
+        else:
+            data = json.loads(raw)
+    except CatalogError:
+        raise
+    except Exception as e:
+        raise CatalogError([f"{path}: {e}"])
+    return data, hashlib.sha256(raw).hexdigest()[:12]
+
+
+# =====================
+# SNAPSHOT
+# reply payload ที่ compile แล้ว เก็บเป็น pickle คู่กับ key ของสิ่งที่ใช้ compile
+# (เนื้อหา catalog, ไฟล์ใน static/, โค้ด) key ไม่ตรง = compile ใหม่
+# =====================
+def load_snapshot(path, key):
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("key") != key:
+        return None
+    return snapshot["replies"]
+
+
+def save_snapshot(path, key, replies):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump({"key": key, "replies": replies}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("could not write catalog snapshot %s: %s", path, e)
+
+
+# =====================
+# CATALOG STORE
+# สลับ Content ทั้งก้อนด้วยการ assign ครั้งเดียว webhook ที่กำลังทำงานใช้เวอร์ชันเดิมจนจบ
+# =====================
+class CatalogStore:
+    def __init__(self, path, compile, static_dir="static", check_interval=5.0, snapshot=None, salt=""):
+        self.path = path
+        self.compile = compile
+        self.static_dir = static_dir
+        self.check_interval = check_interval
+        self.snapshot = snapshot
+        # ค่าที่มีผลกับผล compile นอกเหนือจากไฟล์ (เช่น base URL, เวอร์ชันโค้ด)
+        self.salt = f"{salt}|{os.stat(__file__).st_mtime_ns}"
+        self.current = None
+        self.state = None
+        self.lock = threading.Lock()
+        self.checked_at = 0.0
+        self.loaded_at = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+
+    def get(self):
+        if self.current is None:
+            return self.reload()
+        self._check()
+        return self.current
+
+    # โหลดใหม่ทันที (startup / admin endpoint) ไฟล์ผิด -> CatalogError และเก็บเวอร์ชันเดิมไว้
+    def reload(self):
+        with self.lock:
+            return self._reload()
+
+    def stats(self):
+        return {
+            "version": self.current.version if self.current else None,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "from_snapshot": self.current.from_snapshot if self.current else None,
+        }
+
+    def _reload(self):
+        state = self._state()
+        try:
+            data, version = read(self.path)
+            key = (version, state[1], self.salt)
+            replies = load_snapshot(self.snapshot, key) if self.snapshot else None
+            content = self.compile(data, version, replies)
+        except CatalogError as e:
+            self.failures += 1
+            self.last_error = str(e)
+            raise
+        content.from_snapshot = replies is not None
+        if self.snapshot and replies is None:
+            save_snapshot(self.snapshot, key, content.replies)
+        self.current = content
+        self.state = state
+        self.checked_at = time.monotonic()
+        self.loaded_at = time.time()
+        self.reloads += 1
+        self.last_error = None
+        logger.info("catalog %s loaded from %s%s", content.version, self.path,
+                    " (snapshot)" if content.from_snapshot else "")
+        return content
+
+    # ไฟล์ catalog หรือ static/ เปลี่ยน -> compile ใหม่ (URL รูปมี fingerprint)
+    # thread อื่นที่มาพร้อมกันไม่ต้องรอ ใช้เวอร์ชันเดิมไปก่อน
+    def _check(self):
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return
+        if not self.lock.acquire(blocking=False):
+            return
+        try:
+            self.checked_at = now
+            state = self._state()
+            if state == self.state:
+                return
+            try:
+                self._reload()
+            except CatalogError as e:
+                # ไม่ลองไฟล์เดิมซ้ำทุกรอบ รอจนไฟล์เปลี่ยนอีกครั้ง
+                self.state = state
+                logger.error("catalog reload failed, keeping %s:\n%s", self.current.version, e)
+        finally:
+            self.lock.release()
+
+    def _state(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        entries = []
+        for root, _, files in os.walk(self.static_dir):
+            for name in files:
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except OSError:
+                    # ไฟล์หายระหว่าง walk (assets.build กำลังแทนที่ manifest.json.tmp / ลบ derivative เก่า)
+                    continue
+                entries.append((root, name, st.st_mtime_ns, st.st_size))
+        return mtime, hashlib.sha1(repr(sorted(entries)).encode()).hexdigest()
+
+
+# python catalog.py -> ตรวจ catalog แล้วเขียน snapshot ไว้ล่วงหน้า (รันหลัง python assets.py ตอน build)
+if __name__ == "__main__":
+    import app
+
+    content = app.catalog.reload()
+    print(f"catalog {content.version}: {len(content.replies)} replies -> {app.catalog.snapshot}")
@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# =====================
+# DEDUPE (webhookEventId ภายในช่วงเวลา window)
+# state = shared state (ดู shared_state.py) เมื่อรันหลาย worker
+# =====================
+class Deduplicator:
+    def __init__(self, window=3600, maxsize=100000, state=None):
+        self.window = window
+        self.maxsize = maxsize
+        self.state = state
+        self.seen = OrderedDict()
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+    def first_seen(self, event):
+        event_id = getattr(event, "webhook_event_id", None)
+        if not event_id:
+            return True
+        context = getattr(event, "delivery_context", None)
+        redelivery = bool(context and context.is_redelivery)
+        now = time.time()
+
+        # event ปกติ (ไม่ใช่ redelivery) แค่จดไว้ ไม่ต้องเช็คซ้ำ
+        with self.lock:
+            seen_at = self.seen.get(event_id)
+            duplicate = redelivery and seen_at is not None and now - seen_at < self.window
+            if not duplicate:
+                self._remember(event_id, now)
+
+        if not duplicate and self.state is not None:
+            duplicate = not self.state.add("seen", event_id, now, ttl=self.window) and redelivery
+
+        if duplicate:
+            with self.lock:
+                self.dropped += 1
+            return False
+        return True
+
+    # ส่ง delivery ไม่สำเร็จ -> ลืม event ที่จดไว้ เพื่อให้ redelivery จาก LINE ถูกประมวลผลใหม่
+    def forget(self, events):
+        for event in events:
+            event_id = getattr(event, "webhook_event_id", None)
+            if not event_id:
+                continue
+            with self.lock:
+                self.seen.pop(event_id, None)
+            if self.state is not None:
+                self.state.delete("seen", event_id)
+
+    def stats(self):
+        return {"dropped": self.dropped, "size": len(self.seen)}
+
+    def _remember(self, event_id, now):
+        self.seen[event_id] = now
+        self.seen.move_to_end(event_id)
+        while self.seen and (
+            len(self.seen) > self.maxsize or now - next(iter(self.seen.values())) >= self.window
+        ):
+            self.seen.popitem(last=False)
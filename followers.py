@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+# =====================
+# FOLLOWERS
+# user ที่ follow OA อยู่ บันทึกจาก follow / unfollow event (app.py)
+# แยกจาก broadcast.py ให้ app import แค่ส่วนนี้ (ไม่ต้องโหลด job runner / CLI)
+# broadcast.py ใช้ไฟล์ SQLite เดียวกันเก็บ job / batch
+# =====================
+class Followers:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self._db()
+
+    # connection ต่อ thread และต่อ process เหมือน shared_state.SqliteState
+    def _db(self):
+        db = getattr(self.local, "db", None)
+        if db is None or self.local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(
+                "CREATE TABLE IF NOT EXISTS followers ("
+                " user_id TEXT PRIMARY KEY, following INTEGER, updated_at REAL) WITHOUT ROWID;"
+            )
+            self.local.db = db
+            self.local.pid = os.getpid()
+        return db
+
+    def follow(self, user_id, following=True):
+        self._db().execute(
+            "INSERT OR REPLACE INTO followers VALUES (?, ?, ?)", (user_id, int(following), time.time())
+        )
+
+    def unfollow(self, user_id):
+        self.follow(user_id, following=False)
+
+    def count(self):
+        return self._db().execute("SELECT COUNT(*) FROM followers WHERE following = 1").fetchone()[0]
+
+    # user_id ทีละ chunk เรียงตาม user_id ต่อจาก after (ไม่โหลดทั้งตารางเข้า memory)
+    def stream(self, after="", chunk=500):
+        db = self._db()
+        while True:
+            ids = [u for (u,) in db.execute(
+                "SELECT user_id FROM followers WHERE following = 1 AND user_id > ? ORDER BY user_id LIMIT ?",
+                (after, chunk),
+            )]
+            if not ids:
+                return
+            yield ids
+            after = ids[-1]
+
+    def stats(self):
+        return {"following": self.count()}
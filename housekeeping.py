@@ -0,0 +1,318 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+# =====================
+# HOUSEKEEPING QUEUE
+# คำขอทำความสะอาดจากแขก -> แจ้งกลุ่มแอดมินเป็นรอบ (push ครั้งเดียวต่อรอบ ไม่ใช่ต่อคำขอ)
+#
+# housekeeping.log   append-only (JSON ต่อบรรทัด) = ข้อมูลจริง เขียนก่อนเสมอ
+# housekeeping.sqlite3  index สำหรับ query (dedupe / สถานะ / รอบส่ง) สร้างใหม่จาก log ได้
+#   ทุกครั้งที่เขียน log จะบันทึกขนาด log ไว้ใน transaction เดียวกับ index
+#   ตอนเปิดขนาดไม่ตรง (เครื่องดับระหว่างเขียน) -> ล้าง index แล้ว replay log ทั้งไฟล์
+#
+# รอบส่ง: จองคำขอด้วย claimed_at ก่อน push แล้วค่อยเขียน "notified" ลง log เมื่อส่งสำเร็จ
+#   process ตายระหว่างส่ง -> claim เก่ากว่า CLAIM_TIMEOUT ถือว่ายังไม่แจ้ง ส่งใหม่รอบหน้า
+#
+# 1 ห้อง (หรือ 1 แขกที่ไม่รู้ห้อง) ขอได้วันละ 1 คำขอ ขอซ้ำ -> ตอบสถานะของคำขอเดิม
+# ส่งรอบถัดไปเมื่อครบ interval หรือคำขอที่ยังไม่แจ้งถึง threshold
+# หลาย worker (serve.py): รอบตาม interval ส่งเฉพาะ worker ที่ถือ lease ใน meta (ต่ออายุทุกรอบ)
+#   worker นั้นตาย -> lease หมดใน 2 interval แล้ว worker อื่นรับต่อ, รอบจาก threshold ส่งได้ทุก worker
+# =====================
+PENDING = "pending"
+NOTIFIED = "notified"
+DONE = "done"
+CLAIM_TIMEOUT = 120.0
+
+
+class Request:
+    __slots__ = ("id", "key", "room", "user_id", "day", "created_at", "notified_at", "done_at")
+
+    def __init__(self, id, key, room, user_id, day, created_at, notified_at, done_at):
+        self.id = id
+        self.key = key
+        self.room = room
+        self.user_id = user_id
+        self.day = day
+        self.created_at = created_at
+        self.notified_at = notified_at
+        self.done_at = done_at
+
+    @property
+    def status(self):
+        if self.done_at is not None:
+            return DONE
+        return PENDING if self.notified_at is None else NOTIFIED
+
+
+_COLUMNS = "id, key, room, user_id, day, created_at, notified_at, done_at"
+
+
+class HousekeepingQueue:
+    def __init__(self, path, log_path, interval=300.0, threshold=10, max_batch=50, today=date.today):
+        self.path = path
+        self.log_path = log_path
+        self.interval = interval
+        self.threshold = threshold
+        self.max_batch = max_batch
+        self.today = today
+        self.local = threading.local()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = None
+        self.owner = None
+        self.batches = 0
+        self.sent = 0
+        self.failures = 0
+        self._replay()
+
+    # connection ต่อ thread และต่อ process เหมือน shared_state.SqliteState
+    def _db(self):
+        db = getattr(self.local, "db", None)
+        if db is None or self.local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(
+                "CREATE TABLE IF NOT EXISTS requests ("
+                " id INTEGER PRIMARY KEY, key TEXT, room TEXT, user_id TEXT, day TEXT,"
+                " created_at REAL, notified_at REAL, done_at REAL, claimed_at REAL, UNIQUE (key, day));"
+                "CREATE INDEX IF NOT EXISTS requests_pending ON requests (notified_at, created_at);"
+                "CREATE INDEX IF NOT EXISTS requests_user ON requests (user_id, created_at);"
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value);"
+            )
+            self.local.db = db
+            self.local.pid = os.getpid()
+        return db
+
+    # ---------- log ----------
+    def _append(self, entry):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode()
+        # O_APPEND + write ครั้งเดียว -> บรรทัดไม่ปนกันแม้หลาย worker เขียนพร้อมกัน
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+    # เขียน log แล้ว apply ลง index (เรียกใน BEGIN IMMEDIATE -> การเขียน log เรียงตาม lock ของ index)
+    def _log(self, db, entry):
+        size = self._append(entry)
+        self._apply(db, entry)
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('log_size', ?)", (size,))
+
+    def _apply(self, db, entry):
+        op = entry["op"]
+        if op == "request":
+            db.execute(
+                "INSERT OR IGNORE INTO requests (key, room, user_id, day, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (entry["key"], entry["room"], entry["user_id"], entry["day"], entry["at"]),
+            )
+        elif op == "notified":
+            db.executemany(
+                "UPDATE requests SET notified_at = ?, claimed_at = NULL"
+                " WHERE key = ? AND day = ? AND notified_at IS NULL",
+                [(entry["at"], key, day) for key, day in entry["requests"]],
+            )
+        elif op == "done":
+            db.execute(
+                "UPDATE requests SET done_at = ? WHERE key = ? AND day = ? AND done_at IS NULL",
+                (entry["at"], entry["key"], entry["day"]),
+            )
+
+    def _replay(self):
+        db = self._db()
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            return
+        row = db.execute("SELECT value FROM meta WHERE name = 'log_size'").fetchone()
+        if row is not None and row[0] == size:
+            return
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # สร้างใหม่ทั้งหมด: state ใน index ที่ไม่มีใน log (claim ค้าง ฯลฯ) หายไปด้วย
+            # id เรียงตามลำดับใน log เท่าเดิม (rowid เริ่ม 1 ใหม่เมื่อ table ว่าง)
+            db.execute("DELETE FROM requests")
+            replayed = 0
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # บรรทัดสุดท้ายเขียนไม่จบตอนเครื่องดับ
+                        continue
+                    self._apply(db, entry)
+                    replayed += 1
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('log_size', ?)", (size,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        logger.info("housekeeping index rebuilt from %s (%d entries)", self.log_path, replayed)
+
+    # ---------- guest ----------
+    # -> (Request, created) คำขอซ้ำของห้อง/แขกเดิมในวันเดียวกันได้คำขอเดิมกลับไป
+    # ไม่เรียก LINE API ที่นี่ ชื่อแขกค่อยดึงตอนส่งรอบ (send)
+    def submit(self, user_id, room=None):
+        day = self.today().isoformat()
+        key = room or f"user:{user_id}"
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(f"SELECT {_COLUMNS} FROM requests WHERE key = ? AND day = ?", (key, day)).fetchone()
+            if row is not None:
+                db.execute("COMMIT")
+                return Request(*row), False
+            entry = {"op": "request", "key": key, "room": room, "user_id": user_id,
+                     "day": day, "at": time.time()}
+            self._log(db, entry)
+            row = db.execute(f"SELECT {_COLUMNS} FROM requests WHERE key = ? AND day = ?", (key, day)).fetchone()
+            pending = db.execute("SELECT COUNT(*) FROM requests WHERE notified_at IS NULL").fetchone()[0]
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        if pending >= self.threshold:
+            self.wake.set()
+        return Request(*row), True
+
+    # คำขอล่าสุดของแขก (ตอบจาก index ไม่ต้องเรียก LINE API)
+    def latest(self, user_id):
+        row = self._db().execute(
+            f"SELECT {_COLUMNS} FROM requests WHERE user_id = ? ORDER BY created_at DESC LIMIT 1", (user_id,)
+        ).fetchone()
+        return None if row is None else Request(*row)
+
+    # ---------- admin ----------
+    def mark_done(self, request_id):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(f"SELECT {_COLUMNS} FROM requests WHERE id = ?", (request_id,)).fetchone()
+            if row is not None and row[-1] is None:
+                entry = {"op": "done", "key": row[1], "day": row[4], "at": time.time()}
+                self._log(db, entry)
+                row = db.execute(f"SELECT {_COLUMNS} FROM requests WHERE id = ?", (request_id,)).fetchone()
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return None if row is None else Request(*row)
+
+    # ---------- batching ----------
+    # send(requests) ส่ง 1 push ให้กลุ่มแอดมิน error = คืนคำขอกลับไปรอรอบหน้า
+    def flush(self, send):
+        db = self._db()
+        now = time.time()
+        # จองคำขอไว้ก่อนส่ง worker อื่นที่ flush พร้อมกันจะไม่ได้ชุดเดียวกัน
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute(
+                f"SELECT {_COLUMNS} FROM requests WHERE notified_at IS NULL"
+                " AND (claimed_at IS NULL OR claimed_at < ?) ORDER BY created_at LIMIT ?",
+                (now - CLAIM_TIMEOUT, self.max_batch),
+            ).fetchall()
+            db.executemany("UPDATE requests SET claimed_at = ? WHERE id = ?", [(now, r[0]) for r in rows])
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        if not rows:
+            return 0
+        requests = [Request(*r) for r in rows]
+        try:
+            send(requests)
+        except Exception:
+            self.failures += 1
+            logger.exception("housekeeping batch of %d failed", len(requests))
+            db.executemany("UPDATE requests SET claimed_at = NULL WHERE id = ?", [(r.id,) for r in requests])
+            return 0
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            self._log(db, {"op": "notified", "at": now, "requests": [(r.key, r.day) for r in requests]})
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self.batches += 1
+        self.sent += len(requests)
+        return len(requests)
+
+    # ---------- flusher lease ----------
+    def _lease(self):
+        now = time.time()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT value FROM meta WHERE name = 'flusher'").fetchone()
+            owner, expires = json.loads(row[0]) if row is not None else (None, 0)
+            mine = owner == self.owner or expires <= now
+            if mine:
+                db.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('flusher', ?)",
+                    (json.dumps([self.owner, now + self.interval * 2]),),
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return mine
+
+    def _release(self):
+        db = self._db()
+        row = db.execute("SELECT value FROM meta WHERE name = 'flusher'").fetchone()
+        if row is not None and json.loads(row[0])[0] == self.owner:
+            db.execute("DELETE FROM meta WHERE name = 'flusher'")
+
+    def start(self, send):
+        self.stopping = False
+        # เรียกหลัง fork (lifespan ของแต่ละ worker) -> id ไม่ซ้ำกันระหว่าง worker
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.thread = threading.Thread(target=self._run, args=(send,), name="housekeeping", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping = True
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def _run(self, send):
+        while True:
+            woken = self.wake.wait(self.interval)
+            self.wake.clear()
+            try:
+                # ครบ interval เฉย ๆ -> ส่งเฉพาะ worker ที่ถือ lease (1 push ต่อรอบทั้งระบบ)
+                if woken or self._lease():
+                    # ชุดละ max_batch ค้างเกินก็ส่งต่อจนหมด
+                    while self.flush(send) >= self.max_batch:
+                        pass
+            except Exception:
+                logger.exception("housekeeping flush failed")
+            if self.stopping:
+                try:
+                    self._release()
+                except Exception:
+                    logger.exception("housekeeping lease release failed")
+                return
+
+    def stats(self):
+        db = self._db()
+        counts = dict(db.execute(
+            "SELECT CASE WHEN done_at IS NOT NULL THEN 'done'"
+            " WHEN notified_at IS NOT NULL THEN 'notified' ELSE 'pending' END, COUNT(*)"
+            " FROM requests WHERE day = ? GROUP BY 1",
+            (self.today().isoformat(),),
+        ).fetchall())
+        return {"today": counts, "batches": self.batches, "sent": self.sent, "failures": self.failures}
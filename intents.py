@@ -0,0 +1,88 @@
+import unicodedata
+from functools import lru_cache
+
+# zero-width space / joiner / BOM ที่ติดมากับการ copy-paste
+_ZERO_WIDTH = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))
+# เลขไทย / เลขอารบิก -> 0-9
+_DIGITS = str.maketrans("๐๑๒๓๔๕๖๗๘๙٠١٢٣٤٥٦٧٨٩", "0123456789" * 2)
+_TABLE = {**_ZERO_WIDTH, **_DIGITS}
+
+_BOUNDARY = set(" .,!?:;-/()")
+
+
+# ข้อความที่ไม่มี text (None / ไม่ใช่ str) -> "" ไม่ match intent ไหน
+def normalize(text):
+    if not isinstance(text, str):
+        return ""
+    return _normalize(text)
+
+
+@lru_cache(maxsize=4096)
+def _normalize(text):
+    if text.isascii():
+        return " ".join(text.lower().split())
+    text = unicodedata.normalize("NFKC", text).translate(_TABLE).lower()
+    return " ".join(text.split())
+
+
+class _Node:
+    __slots__ = ("children", "handler", "handlers")
+
+    def __init__(self):
+        self.children = {}
+        self.handler = None
+        self.handlers = set()
+
+
+# =====================
+# INTENT REGISTRY
+# token -> handler (dict lookup) แล้วค่อย fallback ไป prefix trie
+# =====================
+class IntentRegistry:
+    def __init__(self, fuzzy=True, min_prefix=3):
+        self.fuzzy = fuzzy
+        self.min_prefix = min_prefix
+        self.exact = {}
+        self.trie = _Node()
+
+    def add(self, alias, handler):
+        key = normalize(alias)
+        self.exact[key] = handler
+        node = self.trie
+        node.handlers.add(handler)
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            node.handlers.add(handler)
+        node.handler = handler
+
+    def match(self, text):
+        if not isinstance(text, str):
+            return None
+        # ข้อความจาก rich menu / quick reply ตรงกับ alias อยู่แล้ว ไม่ต้อง normalize
+        handler = self.exact.get(text)
+        if handler is not None:
+            return handler
+        key = normalize(text)
+        handler = self.exact.get(key)
+        if handler is None and self.fuzzy:
+            handler = self._fuzzy(key)
+        return handler
+
+    def _fuzzy(self, key):
+        # 1) alias ที่ยาวที่สุดซึ่งเป็น prefix ของข้อความ เช่น "wifiค่ะ" -> "wifi"
+        #    alias สั้นๆ อย่าง "1" ต้องตามด้วยช่องว่าง/เครื่องหมาย ("10" ไม่นับ)
+        node = self.trie
+        best = None
+        for i, ch in enumerate(key):
+            node = node.children.get(ch)
+            if node is None:
+                break
+            if node.handler is not None:
+                end = i + 1
+                if end >= self.min_prefix or end == len(key) or key[end] in _BOUNDARY:
+                    best = node.handler
+        else:
+            # 2) ข้อความเป็น prefix ของ alias ที่ชี้ไป handler เดียว เช่น "uland" -> "uland coffee"
+            if best is None and len(key) >= self.min_prefix and len(node.handlers) == 1:
+                best = next(iter(node.handlers))
+        return best
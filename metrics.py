@@ -0,0 +1,126 @@
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+registry = []
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(n, str(v).replace("\\", "\\\\").replace('"', '\\"')) for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+# =====================
+# COUNTER
+# =====================
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+# =====================
+# HISTOGRAM
+# =====================
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def observe(self, value, *labels):
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += 1
+            state[2] += value
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        for labels, (counts, count, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield self.name + "_bucket", _labels(names, labels + (bound,)), cumulative
+            yield self.name + "_bucket", _labels(names, labels + ("+Inf",)), count
+            yield self.name + "_count", _labels(self.labelnames, labels), count
+            yield self.name + "_sum", _labels(self.labelnames, labels), total
+
+
+# =====================
+# CALLBACK (อ่านค่าตอน scrape เช่น queue depth, cache hits)
+# =====================
+class Callback:
+    def __init__(self, name, help, fn, kind="gauge"):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.kind = kind
+        registry.append(self)
+
+    def samples(self):
+        yield self.name, "", self.fn()
+
+
+def render():
+    lines = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{labels} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# =====================
+# SHARED METRICS
+# =====================
+LINE_API_SECONDS = Histogram(
+    "line_api_request_seconds", "LINE Messaging API call latency", ("endpoint",)
+)
+LINE_API_ERRORS = Counter(
+    "line_api_errors_total", "LINE Messaging API non-2xx responses", ("endpoint", "status")
+)
+
+_ENDPOINTS = (
+    ("/v2/bot/message/reply", "reply_message"),
+    ("/v2/bot/message/push", "push_message"),
+    ("/v2/bot/message/multicast", "multicast"),
+    ("/v2/bot/profile/", "get_profile"),
+)
+
+
+def endpoint_name(url):
+    for path, name in _ENDPOINTS:
+        if path in url:
+            return name
+    return "other"
@@ -0,0 +1,100 @@
+import logging
+import threading
+
+from linebot.exceptions import LineBotApiError
+
+from transport import reply_raw, push_raw
+
+logger = logging.getLogger(__name__)
+
+# LINE รับได้สูงสุด 5 ข้อความต่อ 1 request
+MAX_MESSAGES = 5
+
+totals = {"deliveries": 0, "calls": 0, "saved": 0, "failed": 0}
+_totals_lock = threading.Lock()
+
+
+def _calls_for(count):
+    return -(-count // MAX_MESSAGES)
+
+
+# ส่งซ้ำแล้วมีโอกาสสำเร็จ (connection error / timeout, 429, 5xx) ต่างจาก 4xx เช่น reply token หมดอายุ
+def _retryable(error):
+    if isinstance(error, LineBotApiError):
+        return error.status_code == 429 or error.status_code >= 500
+    return True
+
+
+# =====================
+# SEND PLAN
+# รวมข้อความทั้งหมดของ 1 webhook delivery ต่อ user
+# แล้วส่งด้วย reply token ก่อน ค่อย push เมื่อ reply token หมด
+# =====================
+class SendPlan:
+    def __init__(self, content=None):
+        # catalog เวอร์ชันที่ใช้ตลอด delivery นี้ (reload ระหว่างทางไม่กระทบ)
+        self.content = content
+        self.streams = {}
+        self.naive_calls = 0
+
+    def _stream(self, user_id):
+        stream = self.streams.get(user_id)
+        if stream is None:
+            stream = self.streams[user_id] = ([], [])
+        return stream
+
+    def reply(self, event, messages):
+        tokens, queued = self._stream(event.source.user_id)
+        if event.reply_token and event.reply_token not in tokens:
+            tokens.append(event.reply_token)
+        queued.extend(messages)
+        self.naive_calls += _calls_for(len(messages))
+
+    def push(self, user_id, messages):
+        self._stream(user_id)[1].extend(messages)
+        self.naive_calls += _calls_for(len(messages))
+
+    def calls(self):
+        for _, kind, target, chunk in self._calls():
+            yield kind, target, chunk
+
+    def _calls(self):
+        for user_id, (tokens, queued) in self.streams.items():
+            for i in range(0, len(queued), MAX_MESSAGES):
+                chunk = queued[i:i + MAX_MESSAGES]
+                n = i // MAX_MESSAGES
+                if n < len(tokens):
+                    yield user_id, "reply", tokens[n], chunk
+                else:
+                    yield user_id, "push", user_id, chunk
+
+    # failed_users = user ที่ส่งไม่สำเร็จด้วย error ที่ส่งซ้ำได้ (ให้ผู้เรียกตอบ 500 ให้ LINE ส่ง webhook ซ้ำ)
+    def flush(self, api):
+        sent = 0
+        failed = 0
+        failed_users = set()
+        for user_id, kind, target, chunk in self._calls():
+            send = reply_raw if kind == "reply" else push_raw
+            try:
+                send(api, target, chunk)
+            except Exception as e:
+                # LineBotApiError หรือ connection error / timeout (requests, httpx)
+                # ส่งไม่ได้ที่ user หนึ่ง ไม่หยุดการส่งให้ user อื่นใน delivery เดียวกัน
+                logger.exception("%s to %s failed", kind, target)
+                failed += 1
+                if _retryable(e):
+                    failed_users.add(user_id)
+            sent += 1
+
+        saved = self.naive_calls - sent
+        with _totals_lock:
+            totals["deliveries"] += 1
+            totals["calls"] += sent
+            totals["saved"] += saved
+            totals["failed"] += failed
+        if saved:
+            logger.info("sent %d LINE API calls (%d saved by batching)", sent, saved)
+        return {
+            "calls": sent, "naive_calls": self.naive_calls, "saved": saved,
+            "failed": failed, "failed_users": failed_users,
+        }
@@ -0,0 +1,38 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+# เก็บเฉพาะ stack ที่ผ่านฟังก์ชันพวกนี้ (เส้นทางของ webhook)
+WEBHOOK_FUNCTIONS = ("webhook", "handle_events")
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_name}"
+
+
+# =====================
+# SAMPLING PROFILER
+# ดู stack ของทุก thread ทุกๆ interval แล้วสรุปเป็น collapsed stacks
+# (ใช้กับ flamegraph.pl / speedscope ได้เลย)
+# =====================
+def sample(seconds, interval=0.005, functions=WEBHOOK_FUNCTIONS):
+    stacks = Counter()
+    me = threading.get_ident()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            names = []
+            matched = not functions
+            while frame is not None:
+                matched = matched or frame.f_code.co_name in functions
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if matched:
+                stacks[";".join(reversed(names))] += 1
+        time.sleep(interval)
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# =====================
+# PROFILE CACHE (TTL + LRU)
+# state = shared state (ดู shared_state.py) ให้ worker อื่น / หลัง restart ใช้ชื่อเดิมได้
+# =====================
+class ProfileCache:
+    def __init__(self, fetch, ttl=86400, maxsize=10000, state=None):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.state = state
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def display_name(self, user_id):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+
+        if self.state is not None:
+            entry = self.state.get("profile", user_id)
+            if entry is not None and entry[0] > now:
+                with self.lock:
+                    self.hits += 1
+                    self._remember(user_id, tuple(entry))
+                return entry[1]
+
+        with self.lock:
+            self.misses += 1
+        name = self.fetch(user_id)
+        self.put(user_id, name)
+        return name
+
+    def put(self, user_id, display_name):
+        entry = (time.time() + self.ttl, display_name)
+        with self.lock:
+            self._remember(user_id, entry)
+        if self.state is not None:
+            self.state.set("profile", user_id, entry, ttl=self.ttl)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+        if self.state is not None:
+            self.state.delete("profile", user_id)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+    def _remember(self, user_id, entry):
+        self.entries[user_id] = entry
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
@@ -0,0 +1,97 @@
+import threading
+import time
+
+# ค่าเริ่มต้น: intent ที่ส่งรูปหลายรูปเข้มกว่า intent ข้อความ
+DEFAULT_LIMITS = (
+    "default=20/60,"
+    "coffee=3/60,resort_images=3/60,"
+    "room_detail_sj=3/60,room_detail_ts=3/60,room_detail_ks=3/60"
+)
+
+
+# "coffee=3/60,default=20/60" -> {"coffee": (3, 0.05), ...} (จำนวนครั้ง, token ต่อวินาที)
+def parse_limits(spec):
+    limits = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, rule = item.split("=")
+        count, seconds = rule.split("/")
+        limits[name.strip()] = (float(count), float(count) / float(seconds))
+    limits.setdefault("default", (20.0, 20.0 / 60))
+    return limits
+
+
+# =====================
+# RATE LIMITER
+# token bucket ต่อ (user, intent) เติม token แบบ lazy ตามเวลาที่ผ่านไป
+# collapse เฉพาะ input เดิมซ้ำ (ปุ่ม/วันที่/ข้อความเดียวกัน) intent เดียวกันแต่เลือกค่าใหม่ไม่ถูกทิ้ง
+# state = shared state (ดู shared_state.py) ให้ทุก worker ใช้ bucket เดียวกัน
+# =====================
+class RateLimiter:
+    def __init__(self, limits, collapse_window=5.0, shards=16, sweep_every=1024, state=None):
+        self.limits = limits
+        self.collapse_window = collapse_window
+        self.state = state
+        self.shards = [({}, threading.Lock()) for _ in range(shards)]
+        self.sweep_every = sweep_every
+        self.inserts = [0] * shards
+        self.limited = 0
+        self.collapsed = 0
+
+    def allow(self, user_id, intent, variant=None):
+        capacity, rate = self.limits.get(intent) or self.limits["default"]
+        if self.state is not None:
+            outcome = self.state.update(
+                "rate", f"{intent}:{user_id}",
+                lambda bucket: self._take(bucket, capacity, rate, time.time(), variant),
+                ttl=max(capacity / rate, self.collapse_window),
+            )
+        else:
+            key = (user_id, intent)
+            index = hash(key) % len(self.shards)
+            buckets, lock = self.shards[index]
+            now = time.monotonic()
+            with lock:
+                bucket = buckets.get(key)
+                if bucket is None:
+                    self.inserts[index] += 1
+                    if self.inserts[index] % self.sweep_every == 0:
+                        self._sweep(buckets, now)
+                buckets[key], outcome = self._take(bucket, capacity, rate, now, variant)
+
+        if outcome == "collapsed":
+            self.collapsed += 1
+        elif outcome == "limited":
+            self.limited += 1
+        return outcome == "allowed"
+
+    # bucket = (tokens, เวลาเติมล่าสุด, เวลาที่ผ่านล่าสุด, input ที่ผ่านล่าสุด) -> (bucket ใหม่, ผลลัพธ์)
+    def _take(self, bucket, capacity, rate, now, variant=None):
+        if bucket is None:
+            tokens, last, seen = capacity, None, None
+        else:
+            tokens, updated, last, seen = bucket
+            # กดซ้ำ input เดิมติดๆ กัน -> ตอบครั้งเดียว
+            if last is not None and now - last < self.collapse_window and seen == variant:
+                return bucket, "collapsed"
+            tokens = min(capacity, tokens + (now - updated) * rate)
+
+        if tokens < 1:
+            return (tokens, now, last, seen), "limited"
+        return (tokens - 1, now, now, variant), "allowed"
+
+    def stats(self):
+        return {
+            "limited": self.limited,
+            "collapsed": self.collapsed,
+            "tracked": self.state.count("rate") if self.state else sum(len(b) for b, _ in self.shards),
+        }
+
+    # ลบ bucket ที่เติมเต็มแล้ว (เหมือนไม่เคยใช้) กัน dict โตไม่หยุด
+    def _sweep(self, buckets, now):
+        for key, (tokens, updated, *_) in list(buckets.items()):
+            capacity, rate = self.limits.get(key[1]) or self.limits["default"]
+            idle = now - updated
+            if idle >= self.collapse_window and tokens + idle * rate >= capacity:
+                del buckets[key]
@@ -0,0 +1,7 @@
+import json
+
+
+def serialize(message):
+    return json.dumps(
+        message.as_json_dict(), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
@@ -0,0 +1,69 @@
+# =====================
+# MULTI-WORKER LAUNCHER
+#   python serve.py                      -> WEB_CONCURRENCY worker (ค่าเริ่มต้น = จำนวน CPU)
+#   python serve.py --workers 4 --port 10000
+#
+# - มี gunicorn -> gunicorn + UvicornWorker (restart worker ที่ตาย, reload ด้วย SIGHUP)
+#   ไม่มี -> uvicorn --workers
+# - worker > 1 ต้องแชร์ state: ไม่ได้ตั้ง SHARED_STATE จะใช้ sqlite:state.sqlite3
+# - ย่อรูป (assets.py) ครั้งเดียวก่อนแตก worker แล้วปิด ASSET_BUILD_ON_STARTUP ใน worker
+#   (หลาย worker เขียนไฟล์ derivative ชุดเดียวกันพร้อมกันไม่ได้)
+# - keep-alive 75s ยาวกว่า idle timeout ของ proxy ข้างหน้า กัน 502 ตอน proxy ใช้ connection เดิม
+# =====================
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+
+def main():
+    load_dotenv()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    ap.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    ap.add_argument("--keep-alive", type=int, default=75)
+    ap.add_argument("--graceful-timeout", type=int, default=30)
+    ap.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = ap.parse_args()
+
+    if args.workers > 1:
+        os.environ.setdefault("SHARED_STATE", "sqlite:state.sqlite3")
+    if os.getenv("ASSET_BUILD_ON_STARTUP", "1") == "1":
+        from assets import build_if_available
+
+        build_if_available()
+        os.environ["ASSET_BUILD_ON_STARTUP"] = "0"
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        import uvicorn
+
+        uvicorn.run(
+            "app:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            timeout_keep_alive=args.keep_alive,
+            timeout_graceful_shutdown=args.graceful_timeout,
+            log_level=args.log_level,
+        )
+        return
+
+    os.execvp(sys.executable, [
+        sys.executable, "-m", "gunicorn", "app:app",
+        "--worker-class", "uvicorn.workers.UvicornWorker",
+        "--workers", str(args.workers),
+        "--bind", f"{args.host}:{args.port}",
+        "--keep-alive", str(args.keep_alive),
+        "--graceful-timeout", str(args.graceful_timeout),
+        # worker ค้างเกินนี้ (เช่น thread ติด) gunicorn kill แล้วสร้างใหม่
+        "--timeout", "60",
+        "--log-level", args.log_level,
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+# =====================
+# SESSIONS
+# สถานะการคุยต่อ user (เมนูที่เปิดอยู่, ขั้นตอนจองที่ค้าง, ภาษา, เวลาล่าสุด)
+#
+# memory: OrderedDict เรียงตามเวลาใช้ล่าสุด (LRU) เกิน maxsize -> ตัดตัวเก่าสุด
+#         ตัวหน้าสุดคือตัวที่เงียบนานสุด หมดอายุ (idle_ttl) ก็ตัดจากหน้าได้เลย
+# state (หลาย worker) -> อ่าน state ทุกครั้ง เขียนเมื่อเปลี่ยน memory เป็นแค่ cache
+# spill (worker เดียว) -> เขียนเฉพาะตอนถูกตัดออกจาก LRU อ่านกลับเมื่อ miss
+# =====================
+TOUCH_INTERVAL = 60
+
+
+class Session:
+    __slots__ = ("user_id", "menu", "step", "data", "lang", "last_seen", "saved")
+
+    def __init__(self, user_id, menu=None, step=None, data=None, lang=None, last_seen=0.0):
+        self.user_id = user_id
+        self.menu = menu
+        self.step = step
+        self.data = data
+        self.lang = lang
+        self.last_seen = last_seen
+        # (hash ของค่าที่เก็บล่าสุด, last_seen ตอนเก็บ) ไว้เช็คว่าต้องเขียนซ้ำไหม
+        self.saved = None
+
+    def set_step(self, step, data=None):
+        self.step = step
+        self.data = data
+
+    def clear_step(self):
+        self.step = None
+        self.data = None
+
+    def pack(self):
+        return [self.menu, self.step, self.data, self.lang, self.last_seen]
+
+    @classmethod
+    def unpack(cls, user_id, value):
+        return cls(user_id, *value)
+
+    def _fields_hash(self):
+        return hash((self.menu, self.step, self.data, self.lang))
+
+    def dirty(self):
+        if self.saved is None:
+            return True
+        fields, seen = self.saved
+        return fields != self._fields_hash() or self.last_seen - seen >= TOUCH_INTERVAL
+
+
+class SessionStore:
+    def __init__(self, maxsize=50000, idle_ttl=1800.0, state=None, spill=None):
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self.state = state
+        self.spill = spill
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loaded = 0
+        self.evicted = 0
+        self.expired = 0
+        self.spilled = 0
+
+    # session ของ user (สร้างใหม่ถ้าไม่มีหรือเงียบเกิน idle_ttl) และอัปเดต last_seen
+    def get(self, user_id):
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            session = self.sessions.get(user_id)
+            if session is not None:
+                self.sessions.move_to_end(user_id)
+        # worker อื่นอาจแก้ session นี้ไปแล้ว -> state คือค่าล่าสุด
+        store = self.state if self.state is not None else (self.spill if session is None else None)
+        if store is not None:
+            stored = store.get("session", user_id)
+            if stored is not None:
+                session = Session.unpack(user_id, stored)
+                session.saved = (session._fields_hash(), session.last_seen)
+                self.loaded += 1
+                # spill = ที่พักชั่วคราวตอนถูก evict: โหลดกลับแล้วลบทิ้ง ตัวใน memory เป็นค่าล่าสุด
+                # (evict รอบหน้าถ้า session ว่างจะไม่เขียนทับ ค่าเก่าใน spill จะย้อนกลับมา)
+                if self.state is None:
+                    store.delete("session", user_id)
+        if session is None or now - session.last_seen > self.idle_ttl:
+            self.misses += 1
+            session = Session(user_id)
+        else:
+            self.hits += 1
+        session.last_seen = now
+        with self.lock:
+            self.sessions[user_id] = session
+            self.sessions.move_to_end(user_id)
+            self._evict()
+        return session
+
+    # เรียกหลังจัดการ event เสร็จ
+    def save(self, session):
+        if self.state is None or not session.dirty():
+            return
+        self._write(self.state, session)
+
+    def _write(self, store, session):
+        store.set("session", session.user_id, session.pack(), ttl=self.idle_ttl)
+        session.saved = (session._fields_hash(), session.last_seen)
+
+    def _expire(self, now):
+        cutoff = now - self.idle_ttl
+        while self.sessions:
+            user_id, session = next(iter(self.sessions.items()))
+            if session.last_seen > cutoff:
+                return
+            del self.sessions[user_id]
+            self.expired += 1
+
+    def _evict(self):
+        while len(self.sessions) > self.maxsize:
+            _, session = self.sessions.popitem(last=False)
+            self.evicted += 1
+            if self.spill is not None and (session.step or session.menu or session.lang):
+                # session ว่าง (ไม่มีเมนู/ขั้นตอน) ไม่ต้องเก็บ สร้างใหม่ได้เหมือนเดิม
+                self._write(self.spill, session)
+                self.spilled += 1
+
+    # ขนาดโดยประมาณ: sample session มาวัด (object + ค่าใน slot) + ช่องใน OrderedDict
+    def memory(self, sample=200):
+        with self.lock:
+            count = len(self.sessions)
+            sessions = list(islice(self.sessions.values(), sample))
+            table = sys.getsizeof(self.sessions)
+        if not sessions:
+            return {"sessions": 0, "bytes": table, "bytes_per_session": 0}
+        per = sum(
+            sys.getsizeof(s) + sys.getsizeof(s.user_id) + sys.getsizeof(s.last_seen)
+            + (sys.getsizeof(s.data) if s.data is not None else 0)
+            + (sys.getsizeof(s.saved) + sum(map(sys.getsizeof, s.saved)) if s.saved is not None else 0)
+            for s in sessions
+        ) / len(sessions)
+        total = int(per * count) + table
+        return {"sessions": count, "bytes": total, "bytes_per_session": round(total / count)}
+
+    def stats(self):
+        return {
+            **self.memory(),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loaded": self.loaded,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "spilled": self.spilled,
+        }
@@ -0,0 +1,192 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# =====================
+# SHARED STATE
+# key-value แยกตาม namespace + TTL ให้ทุก feature ใช้ร่วมกัน
+#   memory                -> dict ใน process (uvicorn worker เดียว)
+#   sqlite:state.sqlite3  -> SQLite (WAL) หลาย worker บนเครื่องเดียวกันเห็นค่าเดียวกัน
+# ค่าที่เก็บต้องแปลงเป็น JSON ได้ (tuple กลับมาเป็น list)
+#
+# update(ns, key, fn) = read-modify-write แบบ atomic: fn(ค่าเดิมหรือ None) -> (ค่าใหม่, ผลลัพธ์)
+# ค่าใหม่เป็น None = ลบ key
+# =====================
+PURGE_INTERVAL = 60
+
+
+def _expires(ttl, now):
+    return now + ttl if ttl else None
+
+
+class MemoryState:
+    shared = False
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        self.purged_at = time.time()
+
+    def _live(self, ns, key, now):
+        entry = self.data.get((ns, key))
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            del self.data[(ns, key)]
+            return None
+        return entry
+
+    def get(self, ns, key, default=None):
+        with self.lock:
+            entry = self._live(ns, key, time.time())
+        return default if entry is None else entry[0]
+
+    def set(self, ns, key, value, ttl=None):
+        now = time.time()
+        with self.lock:
+            self._purge(now)
+            self.data[(ns, key)] = (value, _expires(ttl, now))
+
+    # เพิ่มเฉพาะเมื่อยังไม่มี key (หรือหมดอายุแล้ว) -> True ถ้าเพิ่มได้
+    def add(self, ns, key, value, ttl=None):
+        now = time.time()
+        with self.lock:
+            self._purge(now)
+            if self._live(ns, key, now) is not None:
+                return False
+            self.data[(ns, key)] = (value, _expires(ttl, now))
+            return True
+
+    def delete(self, ns, key):
+        with self.lock:
+            self.data.pop((ns, key), None)
+
+    def update(self, ns, key, fn, ttl=None):
+        now = time.time()
+        with self.lock:
+            entry = self._live(ns, key, now)
+            value, result = fn(None if entry is None else entry[0])
+            if value is None:
+                self.data.pop((ns, key), None)
+            else:
+                self.data[(ns, key)] = (value, _expires(ttl, now))
+        return result
+
+    def count(self, ns):
+        with self.lock:
+            return sum(1 for n, _ in self.data if n == ns)
+
+    def _purge(self, now):
+        if now - self.purged_at < PURGE_INTERVAL:
+            return
+        self.purged_at = now
+        for k in [k for k, (_, expires) in self.data.items() if expires is not None and expires <= now]:
+            del self.data[k]
+
+
+class SqliteState:
+    shared = True
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+        self.purged_at = 0.0
+        self._db()
+
+    # connection ต่อ thread และต่อ process (process ที่ fork มาใช้ connection ของ parent ไม่ได้)
+    def _db(self):
+        db = getattr(self.local, "db", None)
+        if db is None or self.local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS shared_state ("
+                " ns TEXT, key TEXT, value TEXT, expires_at REAL,"
+                " PRIMARY KEY (ns, key)) WITHOUT ROWID"
+            )
+            self.local.db = db
+            self.local.pid = os.getpid()
+        return db
+
+    def get(self, ns, key, default=None):
+        row = self._db().execute(
+            "SELECT value FROM shared_state WHERE ns = ? AND key = ?"
+            " AND (expires_at IS NULL OR expires_at > ?)",
+            (ns, key, time.time()),
+        ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, ns, key, value, ttl=None):
+        now = time.time()
+        db = self._db()
+        self._purge(db, now)
+        db.execute(
+            "INSERT OR REPLACE INTO shared_state VALUES (?, ?, ?, ?)",
+            (ns, key, json.dumps(value, ensure_ascii=False), _expires(ttl, now)),
+        )
+
+    def add(self, ns, key, value, ttl=None):
+        now = time.time()
+        db = self._db()
+        self._purge(db, now)
+        cur = db.execute(
+            "INSERT INTO shared_state VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (ns, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at"
+            " WHERE shared_state.expires_at IS NOT NULL AND shared_state.expires_at <= ?",
+            (ns, key, json.dumps(value, ensure_ascii=False), _expires(ttl, now), now),
+        )
+        return cur.rowcount == 1
+
+    def delete(self, ns, key):
+        self._db().execute("DELETE FROM shared_state WHERE ns = ? AND key = ?", (ns, key))
+
+    def update(self, ns, key, fn, ttl=None):
+        db = self._db()
+        # IMMEDIATE = จอง write lock ตั้งแต่อ่าน worker อื่นแทรกระหว่างอ่าน-เขียนไม่ได้
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = db.execute(
+                "SELECT value FROM shared_state WHERE ns = ? AND key = ?"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (ns, key, now),
+            ).fetchone()
+            value, result = fn(None if row is None else json.loads(row[0]))
+            if value is None:
+                db.execute("DELETE FROM shared_state WHERE ns = ? AND key = ?", (ns, key))
+            else:
+                db.execute(
+                    "INSERT OR REPLACE INTO shared_state VALUES (?, ?, ?, ?)",
+                    (ns, key, json.dumps(value, ensure_ascii=False), _expires(ttl, now)),
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return result
+
+    def count(self, ns):
+        return self._db().execute(
+            "SELECT COUNT(*) FROM shared_state WHERE ns = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (ns, time.time()),
+        ).fetchone()[0]
+
+    def _purge(self, db, now):
+        if now - self.purged_at < PURGE_INTERVAL:
+            return
+        self.purged_at = now
+        db.execute("DELETE FROM shared_state WHERE expires_at <= ?", (now,))
+
+
+# SHARED_STATE="memory" | "sqlite:<path>"
+def open_state(spec):
+    spec = (spec or "memory").strip()
+    if spec == "memory":
+        return MemoryState()
+    if spec.startswith("sqlite:"):
+        return SqliteState(spec[len("sqlite:"):])
+    raise ValueError(f"unknown SHARED_STATE {spec!r} (use memory or sqlite:<path>)")
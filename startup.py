@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+
+# import โมดูลนี้เป็นอย่างแรกใน app.py -> จุดเริ่มจับเวลา
+STARTED = time.perf_counter()
+
+stages = []
+background = {}
+ready_at = None
+first_webhook = None
+_last = STARTED
+
+
+# เวลาตั้งแต่ process เริ่มจนถึงตอน import app (python + uvicorn) อ่านจาก /proc บน Linux
+def _process_age():
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+BEFORE_APP = _process_age()
+
+
+def _since_process(at):
+    return BEFORE_APP + at - STARTED
+
+
+def mark(name):
+    global _last
+    now = time.perf_counter()
+    stages.append((name, now - _last))
+    _last = now
+
+
+def ready():
+    global ready_at
+    mark("lifespan")
+    ready_at = time.perf_counter()
+
+
+def webhook_done(seconds):
+    global first_webhook
+    if first_webhook is None:
+        first_webhook = (time.perf_counter(), seconds)
+
+
+# งานที่ไม่จำเป็นต่อการตอบ webhook แรก (เช่นย่อรูป) ทำหลังเปิดรับ request แล้ว
+def run_in_background(name, fn):
+    def run():
+        started = time.perf_counter()
+        try:
+            fn()
+        finally:
+            background[name] = time.perf_counter() - started
+
+    threading.Thread(target=run, name=f"startup-{name}", daemon=True).start()
+
+
+def ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+def report():
+    return {
+        "process_to_app_import_ms": ms(BEFORE_APP),
+        "stages_ms": {name: ms(seconds) for name, seconds in stages},
+        "ready_ms": ms(_since_process(ready_at)) if ready_at else None,
+        "first_webhook_ms": ms(_since_process(first_webhook[0])) if first_webhook else None,
+        "first_webhook_handling_ms": ms(first_webhook[1]) if first_webhook else None,
+        "background_ms": {name: ms(seconds) for name, seconds in background.items()},
+    }
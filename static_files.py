@@ -0,0 +1,123 @@
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, Response
+
+# ชื่อไฟล์ที่มี fingerprint เช่น KS_1.a917dcfa9b.jpg / KS_1.a917dcfa9b.preview.jpg
+TAGGED = re.compile(r"^(?P<stem>.+)\.(?P<tag>[0-9a-f]{10})(?P<suffix>(\.preview)?\.[A-Za-z0-9]+)$")
+
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _etag_matches(header, etag):
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+# =====================
+# STATIC ASSETS
+# URL มี content hash -> ให้ cache แบบ immutable ได้ทั้งปี
+# =====================
+class StaticAssets:
+    def __init__(self, assets, directory="static", stale_max_age=300, legacy_window=0):
+        self.assets = assets
+        self.directory = os.path.realpath(directory)
+        self.stale_max_age = stale_max_age
+        # fingerprint เก่า (ก่อน deploy) ยังเสิร์ฟไฟล์ปัจจุบันให้ได้กี่วินาที, 0 = ตลอด
+        self.legacy_window = legacy_window
+        self.started_at = time.monotonic()
+        self.digests = {}
+        self.lock = threading.Lock()
+
+    def digest(self, relpath):
+        path = os.path.join(self.directory, relpath)
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self.digests.get(relpath)
+        if cached is not None and cached[0] == key:
+            return cached[1], st
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+        with self.lock:
+            self.digests[relpath] = (key, h.hexdigest())
+        return h.hexdigest(), st
+
+    # "images/V1.jpg" -> "images/V1.<hash>.jpg" (ไฟล์ใน derived มี hash อยู่แล้ว)
+    def url_path(self, relpath):
+        head, name = os.path.split(relpath)
+        if TAGGED.match(name):
+            return relpath
+        try:
+            digest, _ = self.digest(relpath)
+        except OSError:
+            return relpath
+        stem, ext = os.path.splitext(name)
+        return f"{head}/{stem}.{digest[:10]}{ext}" if head else f"{stem}.{digest[:10]}{ext}"
+
+    def respond(self, relpath, request):
+        resolved = self._resolve(relpath)
+        if resolved is None:
+            raise HTTPException(status_code=404)
+        target, immutable = resolved
+
+        digest, st = self.digest(target)
+        path = os.path.join(self.directory, target)
+        accept = request.headers.get("accept-encoding", "")
+        encoding, ext = next(
+            ((e, x) for e, x in ENCODINGS if e in accept and os.path.isfile(path + x)), (None, "")
+        )
+        # strong ETag ต้องต่างกันตาม Content-Encoding (ไฟล์ .br / .gz คนละ byte กับต้นฉบับ)
+        etag = f'"{digest[:32]}-{encoding}"' if encoding else f'"{digest[:32]}"'
+        if immutable:
+            cache_control = "public, max-age=31536000, immutable"
+        else:
+            cache_control = f"public, max-age={self.stale_max_age}"
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return FileResponse(path + ext, media_type=media_type, headers=headers)
+        # FileResponse ใช้ http.response.pathsend (zero-copy) เองถ้า server รองรับ
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=st)
+
+    def _resolve(self, relpath):
+        relpath = os.path.normpath(relpath).replace(os.sep, "/")
+        if relpath.startswith(("..", "/")) or any(p.startswith(".") for p in relpath.split("/")):
+            return None
+
+        head, name = os.path.split(relpath)
+        match = TAGGED.match(name)
+        if os.path.isfile(os.path.join(self.directory, relpath)):
+            return relpath, match is not None
+        if match is None:
+            return None
+
+        stem, tag, suffix = match.group("stem", "tag", "suffix")
+        plain = os.path.join(head, stem + suffix)
+        if os.path.isfile(os.path.join(self.directory, plain)):
+            if self.digest(plain)[0][:10] == tag:
+                return plain, True
+            current = plain
+        else:
+            # derivative จาก build ก่อนหน้า -> ไฟล์ derivative ปัจจุบันของภาพเดียวกัน
+            current = self.assets.current(stem, preview=suffix.startswith(".preview"))
+            if current is None:
+                return None
+
+        if self.legacy_window and time.monotonic() - self.started_at > self.legacy_window:
+            return None
+        return current, False
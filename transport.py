@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from linebot import LineBotApi
+from linebot.exceptions import LineBotApiError
+from linebot.http_client import HttpClient, HttpResponse, RequestsHttpResponse
+
+from metrics import LINE_API_ERRORS, LINE_API_SECONDS, endpoint_name
+
+# import ตอนสร้าง client (LINE_HTTP2=0 ไม่ต้องโหลด httpx เลย)
+httpx = None
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = int(os.getenv("LINE_MAX_CONNECTIONS", "20"))
+TIMEOUT = float(os.getenv("LINE_HTTP_TIMEOUT", "5"))
+RETRIES = int(os.getenv("LINE_RETRIES", "3"))
+BACKOFF = float(os.getenv("LINE_RETRY_BACKOFF", "0.3"))
+# auto = ใช้ HTTP/2 ถ้าติดตั้ง httpx[http2] ไว้, 0 = ปิด
+HTTP2 = os.getenv("LINE_HTTP2", "auto")
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# Retry-After จาก LINE อาจนานเป็นนาที แต่ retry อยู่ใน thread ของ webhook (reply token หมดอายุ) -> รอไม่เกินนี้
+MAX_RETRY_AFTER = float(os.getenv("LINE_MAX_RETRY_AFTER", "2"))
+
+# จำกัดจำนวน request ที่ยิงไป LINE พร้อมกันทั้ง process
+MAX_INFLIGHT = int(os.getenv("LINE_MAX_INFLIGHT", str(MAX_CONNECTIONS)))
+inflight = threading.BoundedSemaphore(MAX_INFLIGHT)
+
+
+def observe(url, started, status):
+    endpoint = endpoint_name(url)
+    LINE_API_SECONDS.observe(time.perf_counter() - started, endpoint)
+    if status is None or not 200 <= status < 300:
+        LINE_API_ERRORS.inc(endpoint, str(status or "connection"))
+
+
+def backoff_delay(attempt):
+    # exponential backoff + full jitter
+    return random.uniform(0, BACKOFF * (2 ** attempt))
+
+
+# =====================
+# REQUESTS (HTTP/1.1 keep-alive pool)
+# =====================
+class CappedRetry(Retry):
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, MAX_RETRY_AFTER)
+
+
+# retry ทุก method รวม POST: reply token ใช้ได้ครั้งเดียว (ส่งซ้ำไม่ได้)
+# push / multicast ส่ง X-Line-Retry-Key เสมอ (ดู RAW SEND) -> LINE รับไปแล้วตอบ 409 ไม่ส่งซ้ำ
+class PooledHttpClient(HttpClient):
+    def __init__(self, timeout=TIMEOUT, max_connections=MAX_CONNECTIONS, retries=RETRIES):
+        super().__init__(timeout)
+        retry = CappedRetry(
+            total=retries,
+            backoff_factor=BACKOFF,
+            backoff_jitter=BACKOFF,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=max_connections, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _request(self, method, url, timeout, **kwargs):
+        started = time.perf_counter()
+        status = None
+        try:
+            with inflight:
+                response = self.session.request(
+                    method, url, timeout=self.timeout if timeout is None else timeout, **kwargs
+                )
+            status = response.status_code
+        finally:
+            observe(url, started, status)
+        return RequestsHttpResponse(response)
+
+    def get(self, url, headers=None, params=None, stream=False, timeout=None):
+        return self._request("GET", url, timeout, headers=headers, params=params, stream=stream)
+
+    def post(self, url, headers=None, data=None, timeout=None):
+        return self._request("POST", url, timeout, headers=headers, data=data)
+
+    def delete(self, url, headers=None, data=None, timeout=None):
+        return self._request("DELETE", url, timeout, headers=headers, data=data)
+
+    def put(self, url, headers=None, data=None, timeout=None):
+        return self._request("PUT", url, timeout, headers=headers, data=data)
+
+
+# =====================
+# HTTPX (HTTP/2)
+# =====================
+class HttpxHttpResponse(HttpResponse):
+    def __init__(self, response):
+        self.response = response
+
+    @property
+    def status_code(self):
+        return self.response.status_code
+
+    @property
+    def headers(self):
+        return self.response.headers
+
+    @property
+    def text(self):
+        return self.response.text
+
+    @property
+    def content(self):
+        return self.response.content
+
+    @property
+    def json(self):
+        return self.response.json()
+
+    def iter_content(self, chunk_size=1024, decode_unicode=False):
+        return self.response.iter_bytes(chunk_size)
+
+
+class Http2Client(HttpClient):
+    def __init__(self, timeout=TIMEOUT, max_connections=MAX_CONNECTIONS, retries=RETRIES):
+        super().__init__(timeout)
+        self.retries = retries
+        self.client = httpx.Client(
+            http2=True,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def _request(self, method, url, timeout, **kwargs):
+        started = time.perf_counter()
+        status = None
+        try:
+            response = self._send(method, url, timeout, **kwargs)
+            status = response.status_code
+        finally:
+            observe(url, started, status)
+        return response
+
+    def _send(self, method, url, timeout, **kwargs):
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(self.retries + 1):
+            try:
+                with inflight:
+                    response = self.client.request(method, url, timeout=timeout, **kwargs)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS or attempt == self.retries:
+                    return HttpxHttpResponse(response)
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    time.sleep(min(int(retry_after), MAX_RETRY_AFTER))
+                    continue
+            time.sleep(backoff_delay(attempt))
+
+    def get(self, url, headers=None, params=None, stream=False, timeout=None):
+        return self._request("GET", url, timeout, headers=headers, params=params)
+
+    def post(self, url, headers=None, data=None, timeout=None):
+        return self._request("POST", url, timeout, headers=headers, content=data)
+
+    def delete(self, url, headers=None, data=None, timeout=None):
+        return self._request("DELETE", url, timeout, headers=headers, content=data)
+
+    def put(self, url, headers=None, data=None, timeout=None):
+        return self._request("PUT", url, timeout, headers=headers, content=data)
+
+
+# =====================
+# FACTORY
+# =====================
+def _load_httpx():
+    global httpx
+    try:
+        import httpx as module
+        import h2  # noqa: F401  (httpx ใช้ HTTP/2 ได้ก็ต่อเมื่อมี h2)
+    except ImportError:
+        return None
+    httpx = module
+    return module
+
+
+def make_http_client():
+    if HTTP2 != "0" and _load_httpx() is not None:
+        return Http2Client()
+    if HTTP2 == "1":
+        logger.warning("LINE_HTTP2=1 but httpx[http2] is not installed, using HTTP/1.1")
+    return PooledHttpClient()
+
+
+def make_line_bot_api(access_token, endpoint=LineBotApi.DEFAULT_API_ENDPOINT):
+    # client ตัวเดียวแชร์ pool ให้ทุก thread ใน worker
+    client = make_http_client()
+    return LineBotApi(
+        access_token, endpoint=endpoint, timeout=TIMEOUT, http_client=lambda timeout: client
+    )
+
+
+# =====================
+# RAW SEND (ข้อความที่ serialize ไว้แล้วเป็น JSON bytes)
+# =====================
+def _messages(messages):
+    return b"[" + b",".join(messages) + b"]"
+
+
+def reply_raw(api, reply_token, messages):
+    body = b'{"replyToken":' + json.dumps(reply_token).encode() + b',"messages":' + _messages(messages) + b"}"
+    api._post("/v2/bot/message/reply", data=body)
+
+
+def push_raw(api, to, messages):
+    body = b'{"to":' + json.dumps(to).encode() + b',"messages":' + _messages(messages) + b"}"
+    _post_keyed(api, "/v2/bot/message/push", body)
+
+
+# retry_key (UUID) = X-Line-Retry-Key: ส่งซ้ำด้วย key เดิม LINE ตอบ 409 แทนการส่งซ้ำ
+# คืน request id ของ LINE
+def multicast_raw(api, to, messages, retry_key=None):
+    body = b'{"to":' + json.dumps(to).encode() + b',"messages":' + _messages(messages) + b"}"
+    return _post_keyed(api, "/v2/bot/message/multicast", body, retry_key)
+
+
+# ไม่ได้ให้ key มา -> สร้างใหม่ต่อ call ให้ transport retry (5xx หลัง LINE รับไปแล้ว) ไม่ส่งซ้ำ
+# 409 ของ key ที่สร้างเอง = retry รอบก่อนใน call นี้สำเร็จแล้ว, key ของผู้เรียก -> ให้ผู้เรียกตัดสินเอง
+def _post_keyed(api, path, body, retry_key=None):
+    headers = {"Content-Type": "application/json", "X-Line-Retry-Key": retry_key or str(uuid.uuid4())}
+    try:
+        response = api._post(path, data=body, headers=headers)
+    except LineBotApiError as e:
+        if retry_key is None and e.status_code == 409:
+            return e.accepted_request_id
+        raise
+    return response.headers.get("X-Line-Request-Id")
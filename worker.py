@@ -0,0 +1,62 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    pass
+
+
+# =====================
+# EVENT QUEUE
+# webhook ตอบ 200 ทันที แล้วให้ worker ส่งข้อความตามหลัง
+# =====================
+class EventQueue:
+    def __init__(self, workers=8, maxsize=1000, put_timeout=1.0):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.put_timeout = put_timeout
+        self.queue = None
+        self.tasks = []
+
+    async def start(self, handler):
+        self.queue = asyncio.Queue(self.maxsize)
+        self.tasks = [
+            asyncio.create_task(self._run(handler))
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self, drain_timeout=5.0):
+        if self.queue is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("event queue stopped with %d pending", self.queue.qsize())
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.queue = None
+
+    async def submit(self, item):
+        # backpressure: รอคิวว่างได้ไม่เกิน put_timeout
+        try:
+            await asyncio.wait_for(self.queue.put(item), self.put_timeout)
+        except asyncio.TimeoutError:
+            raise QueueFull()
+
+    def depth(self):
+        return self.queue.qsize() if self.queue is not None else 0
+
+    async def _run(self, handler):
+        while True:
+            item = await self.queue.get()
+            try:
+                # LINE SDK เป็น sync -> รันใน thread จะได้ไม่บล็อก event loop
+                await asyncio.to_thread(handler, item)
+            except Exception:
+                logger.exception("event handler failed")
+            finally:
+                self.queue.task_done()